@@ -14,7 +14,7 @@ import logging
 
 from models import Event, EventType, GuildSettings
 from storage import (
-    add_event, get_events_by_date, get_events_by_type,
+    add_event, add_events, get_events_by_date, get_events_by_type,
     update_event, delete_event, get_guild_settings,
     save_guild_setting, load_polls, save_polls,
     load_guild_settings, save_guild_settings, save_events, load_events
@@ -65,9 +65,8 @@ class AdminCommands(commands.Cog):
         return poll_channel
 
     async def _create_test_events(self, guild_id: int, date_str: str, titles_and_types: list[tuple[str, EventType]]) -> list[Event]:
-        created: list[Event] = []
-        for title, etype in titles_and_types:
-            event = Event(
+        created: list[Event] = [
+            Event(
                 id=str(uuid.uuid4()),
                 title=title,
                 date=date_str,
@@ -76,8 +75,9 @@ class AdminCommands(commands.Cog):
                 feedback_only=False,
                 guild_id=guild_id,
             )
-            await add_event(event.to_dict())
-            created.append(event)
+            for title, etype in titles_and_types
+        ]
+        await add_events([event.to_dict() for event in created])
         return created
     
     # Ensure that all application (slash) commands in this cog are restricted to server administrators or Organisers role
@@ -765,8 +765,9 @@ class AdminCommands(commands.Cog):
             
             # Prevent duplicate events (same date, title, and type) within this guild
             existing_events = await get_events_by_date(date_str, guild_id=interaction.guild_id)
+            title_key = title.strip().lower()
             if any(
-                e.get("event_type") == event_type.value and e.get("title", "").strip().lower() == title.strip().lower()
+                e.get("event_type") == event_type.value and e.get("title", "").strip().lower() == title_key
                 for e in existing_events
             ):
                 duplicate_msg = format_message(MessageType.ERROR, 'duplicate_event',
@@ -810,8 +811,9 @@ class AdminCommands(commands.Cog):
             
             # Prevent duplicate events (same date, title, and type)
             existing_events = await get_events_by_date(date, guild_id=interaction.guild_id)
+            title_key = title.strip().lower()
             if any(
-                e.get("event_type") == event_type.value and e.get("title", "").strip().lower() == title.strip().lower()
+                e.get("event_type") == event_type.value and e.get("title", "").strip().lower() == title_key
                 for e in existing_events
             ):
                 await interaction.followup.send(
@@ -990,13 +992,15 @@ class AdminCommands(commands.Cog):
                 return
             
             date, title = parts
+            date = date.strip()
+            title = title.strip()
             
             # Validate date format
             try:
-                datetime.strptime(date.strip(), "%Y-%m-%d")
+                datetime.strptime(date, "%Y-%m-%d")
             except ValueError:
                 await interaction.response.send_message(
-                    f"❌ Invalid date format: `{date.strip()}`\n"
+                    f"❌ Invalid date format: `{date}`\n"
                     "Please use YYYY-MM-DD format (e.g., 2024-12-25)",
                     ephemeral=True
                 )
@@ -1015,8 +1019,8 @@ class AdminCommands(commands.Cog):
             # Create updated event
             updated_event = Event(
                 id=event_id,
-                title=title.strip(),
-                date=date.strip(),
+                title=title,
+                date=date,
                 event_type=event_type,
                 created_at=original_created_at or datetime.utcnow(),
                 guild_id=(original.get("guild_id") if original else interaction.guild_id)
@@ -1030,8 +1034,8 @@ class AdminCommands(commands.Cog):
                     title=f"✅ {event_type.value.replace('_', ' ').title()} Updated",
                     color=0x00ff00
                 )
-                embed.add_field(name="📅 Date", value=date.strip(), inline=True)
-                embed.add_field(name="📝 Title", value=title.strip(), inline=True)
+                embed.add_field(name="📅 Date", value=date, inline=True)
+                embed.add_field(name="📝 Title", value=title, inline=True)
                 embed.set_footer(text=f"Event ID: {event_id}")
                 
                 await interaction.response.send_message(embed=embed, ephemeral=True)
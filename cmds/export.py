@@ -3,6 +3,7 @@ Export and poll management commands for CampPoll bot.
 Handles poll closing and attendance data export.
 """
 
+import asyncio
 from typing import Optional
 import discord
 from discord.ext import commands
@@ -10,13 +11,37 @@ from discord import app_commands
 import logging
 
 from models import PollMeta
-from storage import get_poll, load_polls
+from storage import get_poll_by_message_id, get_active_polls_by_guild
 from services.poll_manager import close_poll
-from services.csv_service import create_attendance_csv, export_user_votes
+from services.csv_service import create_attendance_csv, export_user_votes, prepare_csv_upload
 from storage import get_guild_settings
+from utils.discord import (
+    create_poll_closed_embed, create_attendance_export_embed, create_user_votes_export_embed
+)
 
 logger = logging.getLogger(__name__)
 
+async def _send_ephemeral(interaction: discord.Interaction, content: str) -> None:
+    """Reply ephemerally, as the initial response or as a followup after a defer."""
+    if interaction.response.is_done():
+        await interaction.followup.send(content, ephemeral=True)
+    else:
+        await interaction.response.send_message(content, ephemeral=True)
+
+async def _resolve_poll(
+    interaction: discord.Interaction, message_id: str, *, require_active: bool = False
+) -> Optional[PollMeta]:
+    """Find this guild's poll by message ID, replying with an error if there is none."""
+    poll_data = await get_poll_by_message_id(interaction.guild_id, message_id, active_only=require_active)
+    if not poll_data:
+        kind = "active poll" if require_active else "poll"
+        await _send_ephemeral(
+            interaction,
+            f"❌ No {kind} found with message ID `{message_id}` in this server."
+        )
+        return None
+    return PollMeta.from_dict(poll_data)
+
 class ExportCommands(commands.Cog):
     """Commands for poll management and data export."""
     
@@ -32,56 +57,29 @@ class ExportCommands(commands.Cog):
     async def end_poll(self, interaction: discord.Interaction, message_id: str):
         """Manually close an active poll."""
         try:
-            await interaction.response.defer(ephemeral=True)
-            
-            # Find the poll by message ID
-            all_polls = await load_polls()
-            target_poll = None
-            
-            for poll_data in all_polls.values():
-                if (str(poll_data.get("message_id")) == message_id and 
-                    poll_data.get("guild_id") == interaction.guild_id and
-                    poll_data.get("closed_at") is None):
-                    target_poll = PollMeta.from_dict(poll_data)
-                    break
-            
-            if not target_poll:
-                await interaction.followup.send(
-                    f"❌ No active poll found with message ID `{message_id}` in this server.",
-                    ephemeral=True
-                )
+            # Lookups are in-memory, so fast failures are answered without a defer round-trip
+            # Poll lookup and guild settings are independent; fetch them together
+            target_poll, guild_settings = await asyncio.gather(
+                _resolve_poll(interaction, message_id, require_active=True),
+                get_guild_settings(interaction.guild_id),
+            )
+            if target_poll is None:
                 return
             
-            # Get guild settings
-            guild_settings = await get_guild_settings(interaction.guild_id)
             if not guild_settings:
-                await interaction.followup.send(
+                await interaction.response.send_message(
                     "❌ No guild settings found. Please configure the bot first.",
                     ephemeral=True
                 )
                 return
             
+            await interaction.response.defer(ephemeral=True)
+            
             # Close the poll
             success = await close_poll(self.bot, interaction.guild, target_poll, guild_settings)
             
             if success:
-                embed = discord.Embed(
-                    title="✅ Poll Closed",
-                    description=f"Poll for **{target_poll.poll_date}** has been closed manually.",
-                    color=0x00ff00
-                )
-                embed.add_field(
-                    name="📊 Final Stats",
-                    value=f"**{target_poll.total_votes}** total votes\n**{len(target_poll.options)}** options",
-                    inline=True
-                )
-                embed.add_field(
-                    name="📄 Results",
-                    value="Results and CSV sent to organizers channel",
-                    inline=True
-                )
-                embed.set_footer(text=f"Poll ID: {target_poll.id}")
-                
+                embed = create_poll_closed_embed(target_poll)
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 
                 logger.info(f"Manually closed poll {target_poll.id} in guild {interaction.guild_id}")
@@ -93,41 +91,28 @@ class ExportCommands(commands.Cog):
                 
         except Exception as e:
             logger.error(f"Error ending poll: {e}")
-            await interaction.followup.send(
-                "❌ An error occurred while closing the poll.",
-                ephemeral=True
-            )
+            await _send_ephemeral(interaction, "❌ An error occurred while closing the poll.")
     
     @app_commands.command(name="exportattendance", description="Export attendance data for a poll")
     @app_commands.describe(message_id="The message ID of the poll to export")
     async def export_attendance(self, interaction: discord.Interaction, message_id: str):
         """Export detailed attendance data as CSV."""
         try:
-            await interaction.response.defer(ephemeral=True)
-            
-            # Find the poll by message ID
-            all_polls = await load_polls()
-            target_poll = None
-            
-            for poll_data in all_polls.values():
-                if (str(poll_data.get("message_id")) == message_id and 
-                    poll_data.get("guild_id") == interaction.guild_id):
-                    target_poll = PollMeta.from_dict(poll_data)
-                    break
-            
-            if not target_poll:
-                await interaction.followup.send(
-                    f"❌ No poll found with message ID `{message_id}` in this server.",
-                    ephemeral=True
-                )
+            target_poll = await _resolve_poll(interaction, message_id)
+            if target_poll is None:
                 return
             
-            # Build optional user_id -> display_name map for readability
+            # Defer only once we know there is CSV work to do
+            await interaction.response.defer(ephemeral=True)
+            
+            # Build optional user_id -> display_name map for readability (voters only)
             members_map = {}
             try:
-                for m in interaction.guild.members:
-                    if not m.bot:
-                        members_map[m.id] = m.display_name
+                voter_ids = {uid for option in target_poll.options for uid in option.votes}
+                for uid in voter_ids:
+                    m = interaction.guild.get_member(uid)
+                    if m and not m.bot:
+                        members_map[uid] = m.display_name
             except Exception:
                 members_map = {}
 
@@ -141,37 +126,13 @@ class ExportCommands(commands.Cog):
                 )
                 return
             
-            # Create file
-            filename = f"attendance_{target_poll.poll_date}_{target_poll.id[:8]}.csv"
-            csv_file = discord.File(csv_data, filename=filename)
-            
-            # Create info embed
-            embed = discord.Embed(
-                title="📄 Attendance Export",
-                description=f"Detailed attendance data for poll on **{target_poll.poll_date}**",
-                color=0x007bff
-            )
-            
-            embed.add_field(
-                name="📊 Poll Stats",
-                value=f"**{target_poll.total_votes}** total votes\n**{len(target_poll.options)}** options",
-                inline=True
-            )
-            
-            status = "🔒 Closed" if target_poll.is_closed else "🔓 Active"
-            embed.add_field(
-                name="📈 Status",
-                value=status,
-                inline=True
-            )
-            
-            embed.add_field(
-                name="📅 Export Details",
-                value=f"Poll Date: {target_poll.poll_date}\nExported: {discord.utils.utcnow().strftime('%Y-%m-%d %H:%M UTC')}",
-                inline=False
+            # Create file; only exports near Discord's upload limit are gzipped
+            csv_data, filename = await prepare_csv_upload(
+                csv_data, f"attendance_{target_poll.poll_date}_{target_poll.id[:8]}.csv"
             )
+            csv_file = discord.File(csv_data, filename=filename)
             
-            embed.set_footer(text=f"Poll ID: {target_poll.id}")
+            embed = create_attendance_export_embed(target_poll)
             
             await interaction.followup.send(
                 embed=embed,
@@ -183,35 +144,20 @@ class ExportCommands(commands.Cog):
             
         except Exception as e:
             logger.error(f"Error exporting attendance: {e}")
-            await interaction.followup.send(
-                "❌ An error occurred while exporting attendance data.",
-                ephemeral=True
-            )
+            await _send_ephemeral(interaction, "❌ An error occurred while exporting attendance data.")
     
     @app_commands.command(name="exportuservotes", description="Export detailed user vote data")
     @app_commands.describe(message_id="The message ID of the poll to export")
     async def export_user_votes(self, interaction: discord.Interaction, message_id: str):
         """Export user-specific voting data."""
         try:
-            await interaction.response.defer(ephemeral=True)
-            
-            # Find the poll
-            all_polls = await load_polls()
-            target_poll = None
-            
-            for poll_data in all_polls.values():
-                if (str(poll_data.get("message_id")) == message_id and 
-                    poll_data.get("guild_id") == interaction.guild_id):
-                    target_poll = PollMeta.from_dict(poll_data)
-                    break
-            
-            if not target_poll:
-                await interaction.followup.send(
-                    f"❌ No poll found with message ID `{message_id}` in this server.",
-                    ephemeral=True
-                )
+            target_poll = await _resolve_poll(interaction, message_id)
+            if target_poll is None:
                 return
             
+            # Defer only once we know there is CSV work to do
+            await interaction.response.defer(ephemeral=True)
+            
             # Create user votes CSV
             csv_data = await export_user_votes(target_poll)
             
@@ -222,30 +168,13 @@ class ExportCommands(commands.Cog):
                 )
                 return
             
-            # Create file
-            filename = f"user_votes_{target_poll.poll_date}_{target_poll.id[:8]}.csv"
-            csv_file = discord.File(csv_data, filename=filename)
-            
-            # Create info embed
-            embed = discord.Embed(
-                title="👥 User Votes Export",
-                description=f"Individual vote data for poll on **{target_poll.poll_date}**",
-                color=0x9932cc
-            )
-            
-            embed.add_field(
-                name="📊 Voting Summary",
-                value=f"**{target_poll.total_votes}** users voted",
-                inline=True
-            )
-            
-            embed.add_field(
-                name="🔒 Privacy Notice", 
-                value="Contains user IDs - handle securely",
-                inline=True
+            # Create file; only exports near Discord's upload limit are gzipped
+            csv_data, filename = await prepare_csv_upload(
+                csv_data, f"user_votes_{target_poll.poll_date}_{target_poll.id[:8]}.csv"
             )
+            csv_file = discord.File(csv_data, filename=filename)
             
-            embed.set_footer(text=f"Poll ID: {target_poll.id}")
+            embed = create_user_votes_export_embed(target_poll)
             
             await interaction.followup.send(
                 embed=embed,
@@ -257,20 +186,14 @@ class ExportCommands(commands.Cog):
             
         except Exception as e:
             logger.error(f"Error exporting user votes: {e}")
-            await interaction.followup.send(
-                "❌ An error occurred while exporting user votes.",
-                ephemeral=True
-            )
+            await _send_ephemeral(interaction, "❌ An error occurred while exporting user votes.")
     
     @app_commands.command(name="listactivepolls", description="List all active polls in this server")
     async def list_active_polls(self, interaction: discord.Interaction):
         """List all active polls for this guild."""
         try:
-            all_polls = await load_polls()
-            active_polls = [
-                PollMeta.from_dict(poll) for poll in all_polls.values()
-                if poll["guild_id"] == interaction.guild_id and poll["closed_at"] is None
-            ]
+            # Render straight from the stored dicts; a full PollMeta isn't needed for a listing
+            active_polls = await get_active_polls_by_guild(interaction.guild_id)
             
             if not active_polls:
                 await interaction.response.send_message(
@@ -286,16 +209,18 @@ class ExportCommands(commands.Cog):
             )
             
             for i, poll in enumerate(active_polls, 1):
-                channel = interaction.guild.get_channel(poll.channel_id)
+                channel = interaction.guild.get_channel(poll["channel_id"])
                 channel_name = channel.name if channel else "Unknown Channel"
+                options = poll.get("options", [])
+                total_votes = len({uid for opt in options for uid in opt.get("votes", [])})
                 
                 embed.add_field(
-                    name=f"{i}. Poll for {poll.poll_date}",
+                    name=f"{i}. Poll for {poll['poll_date']}",
                     value=(
-                        f"**Options:** {len(poll.options)}\n"
-                        f"**Votes:** {poll.total_votes}\n"
+                        f"**Options:** {len(options)}\n"
+                        f"**Votes:** {total_votes}\n"
                         f"**Channel:** #{channel_name}\n"
-                        f"**Message ID:** `{poll.message_id}`"
+                        f"**Message ID:** `{poll['message_id']}`"
                     ),
                     inline=False
                 )
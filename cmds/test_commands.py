@@ -8,11 +8,11 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
-from datetime import datetime
 
 from models import Event, EventType
 from services.poll_manager import publish_attendance_poll, publish_feedback_polls
-from storage import get_guild_settings, add_event, get_events_by_date
+from storage import get_guild_settings, add_events, get_events_by_date
+from utils.time import tz_today
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +46,7 @@ class TestCommands(commands.Cog):
             )
             
             # Create test events
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = tz_today(settings.get("timezone", "Europe/Helsinki"))
             
             # Check if we already have events for today
             existing_events = await get_events_by_date(today, guild_id=interaction.guild_id)
@@ -72,9 +72,9 @@ class TestCommands(commands.Cog):
                     )
                 ]
                 
-                # Save test events
+                # Save test events in one write
+                await add_events([event.to_dict() for event in test_events])
                 for event in test_events:
-                    await add_event(event.to_dict())
                     logger.info(f"Created test event: {event.title} for {event.date}")
             
             # Publish test poll
@@ -118,7 +118,7 @@ class TestCommands(commands.Cog):
             )
             
             # Create test events for today
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = tz_today(settings.get("timezone", "Europe/Helsinki"))
             
             # Check if we already have events for today
             existing_events = await get_events_by_date(today, guild_id=interaction.guild_id)
@@ -144,9 +144,9 @@ class TestCommands(commands.Cog):
                     )
                 ]
                 
-                # Save test events
+                # Save test events in one write
+                await add_events([event.to_dict() for event in test_events])
                 for event in test_events:
-                    await add_event(event.to_dict())
                     logger.info(f"Created test event: {event.title} for {event.date}")
             
             # Publish test feedback polls
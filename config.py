@@ -5,10 +5,11 @@ Handles environment variables and bot settings.
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables once, at first import; from_env is memoized on top
 load_dotenv()
 
 @dataclass
@@ -27,8 +28,9 @@ class BotConfig:
     polls_file: str = "polls.json"
     
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls) -> "BotConfig":
-        """Create config from environment variables."""
+        """Create config from environment variables (memoized; call from_env.cache_clear() to re-read)."""
         token = os.getenv("DISCORD_BOT_TOKEN")
         if not token:
             raise ValueError("DISCORD_BOT_TOKEN environment variable is required")
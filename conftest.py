@@ -7,12 +7,18 @@ regardless of the directory pytest started collection from.
 
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
+# Skip .pyc writes for this run and any worker subprocesses (e.g. pytest-xdist)
+sys.dont_write_bytecode = True
+os.environ.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+
 # Path of this file's parent directory (project root)
 PROJECT_ROOT = Path(__file__).resolve().parent
 
-# Insert project root at the beginning of sys.path if not already present.
-if str(PROJECT_ROOT) not in sys.path:
+# Insert project root at the beginning of sys.path if not already present,
+# comparing resolved paths so relative or symlinked entries are not duplicated.
+if not any(Path(p or ".").resolve() == PROJECT_ROOT for p in sys.path):
     sys.path.insert(0, str(PROJECT_ROOT)) 
\ No newline at end of file
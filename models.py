@@ -6,7 +6,8 @@ Defines the core entities: Event, EventType, PollMeta, etc.
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import List, Dict, Optional
+from itertools import filterfalse
+from typing import Iterable, List, Dict, Optional, Set, Tuple
 
 class EventType(Enum):
     """Types of events that can be scheduled."""
@@ -18,7 +19,20 @@ class EventType(Enum):
     CYPRUS_CONTEST = "cyprus_contest"  # Cyprus contest - feedback only, no reminders
     CYPRUS_EDITORIAL = "cyprus_editorial"  # Cyprus editorial - feedback only, no reminders
 
-@dataclass
+# Plain dict lookup is cheaper than EventType(value) when rehydrating many records
+_EVENT_TYPES_BY_VALUE: Dict[str, EventType] = {event_type.value: event_type for event_type in EventType}
+
+# Event types that get attendance polls
+_POLLABLE_EVENT_TYPES = frozenset({EventType.LECTURE, EventType.CONTEST})
+
+def _event_type(value) -> EventType:
+    """Resolve an EventType by value; unknown values raise ValueError like EventType(value)."""
+    try:
+        return _EVENT_TYPES_BY_VALUE[value]
+    except (KeyError, TypeError):
+        return EventType(value)
+
+@dataclass(slots=True)
 class Event:
     """Represents a scheduled event."""
     id: str
@@ -28,20 +42,25 @@ class Event:
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     feedback_only: bool = False  # if True, attendance poll is skipped and only feedback is posted
     guild_id: Optional[int] = None  # scope event to a specific guild when set
+    # (created_at, its ISO string); reused by to_dict while created_at is unchanged
+    _created_at_iso: Optional[Tuple[datetime, str]] = field(init=False, default=None, repr=False, compare=False)
     
     def __post_init__(self):
         """Convert string event_type to EventType enum if needed."""
         if isinstance(self.event_type, str):
-            try:
-                self.event_type = EventType(self.event_type)
-            except ValueError:
-                # Fallback to a non-pollable type to avoid crashes on bad input
-                self.event_type = EventType.EXTRA_LECTURE
+            # Fallback to a non-pollable type to avoid crashes on bad input
+            self.event_type = _EVENT_TYPES_BY_VALUE.get(self.event_type, EventType.EXTRA_LECTURE)
     
     @property
     def is_pollable(self) -> bool:
         """Check if this event type should be included in polls."""
-        return self.event_type in [EventType.LECTURE, EventType.CONTEST]
+        return self.event_type in _POLLABLE_EVENT_TYPES
+    
+    def _created_at_isoformat(self) -> str:
+        cached = self._created_at_iso
+        if cached is None or cached[0] is not self.created_at:
+            cached = self._created_at_iso = (self.created_at, self.created_at.isoformat())
+        return cached[1]
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
@@ -50,7 +69,7 @@ class Event:
             "title": self.title,
             "date": self.date,
             "event_type": self.event_type.value,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self._created_at_isoformat(),
             "feedback_only": self.feedback_only,
             "guild_id": self.guild_id,
         }
@@ -58,17 +77,20 @@ class Event:
     @classmethod
     def from_dict(cls, data: Dict) -> "Event":
         """Create Event from dictionary."""
-        return cls(
+        created_at = datetime.fromisoformat(data["created_at"])
+        event = cls(
             id=data["id"],
             title=data["title"],
             date=data["date"],
-            event_type=EventType(data["event_type"]),
-            created_at=datetime.fromisoformat(data["created_at"]),
+            event_type=_event_type(data["event_type"]),
+            created_at=created_at,
             feedback_only=data.get("feedback_only", False),
             guild_id=data.get("guild_id"),
         )
+        event._created_at_iso = (created_at, data["created_at"])
+        return event
 
-@dataclass
+@dataclass(slots=True)
 class PollOption:
     """Represents a poll option with vote tracking."""
     event_id: str
@@ -76,27 +98,52 @@ class PollOption:
     event_type: EventType
     votes: List[int] = field(default_factory=list)  # User IDs who voted
     answer_id: Optional[str] = None  # Discord poll answer id
+    # Mirror of votes for O(1) membership checks; votes keeps the vote order for JSON
+    _vote_set: Set[int] = field(init=False, repr=False, compare=False)
+    _revision: int = field(init=False, default=0, repr=False, compare=False)  # bumped on every vote change
+    
+    def __post_init__(self):
+        self._vote_set = set(self.votes)
     
     @property
     def vote_count(self) -> int:
         """Get the number of votes for this option."""
         return len(self.votes)
     
+    def has_vote(self, user_id: int) -> bool:
+        """Check if a user voted for this option."""
+        return user_id in self._vote_set
+    
+    def set_votes(self, user_ids: Iterable[int]) -> None:
+        """
+        Replace all votes, e.g. with the final voter list from Discord.
+        
+        A list argument is adopted as-is rather than copied; callers hand over
+        freshly collected voter lists, so a copy would only double the memory.
+        """
+        self.votes = user_ids if isinstance(user_ids, list) else list(user_ids)
+        self._vote_set = set(self.votes)
+        self._revision += 1
+    
     def add_vote(self, user_id: int) -> bool:
         """Add a vote from a user. Returns True if vote was added."""
-        if user_id not in self.votes:
-            self.votes.append(user_id)
-            return True
-        return False
+        if user_id in self._vote_set:
+            return False
+        self._vote_set.add(user_id)
+        self.votes.append(user_id)
+        self._revision += 1
+        return True
     
     def remove_vote(self, user_id: int) -> bool:
         """Remove a vote from a user. Returns True if vote was removed."""
-        if user_id in self.votes:
-            self.votes.remove(user_id)
-            return True
-        return False
+        if user_id not in self._vote_set:
+            return False
+        self._vote_set.discard(user_id)
+        self.votes.remove(user_id)
+        self._revision += 1
+        return True
 
-@dataclass
+@dataclass(slots=True)
 class PollMeta:
     """Metadata for a published poll."""
     id: str
@@ -107,26 +154,71 @@ class PollMeta:
     options: List[PollOption] = field(default_factory=list)
     published_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     closed_at: Optional[datetime] = None
-    reminded_users: List[int] = field(default_factory=list)  # Users who got reminders
+    reminded_users: Set[int] = field(default_factory=set)  # Users who got reminders (a list in JSON)
     is_feedback: bool = False  # True for feedback polls that don't need reminders
+    # answer_id / event_id -> option lookups for the vote handlers, built from options
+    _by_answer: Dict[str, PollOption] = field(init=False, repr=False, compare=False)
+    _by_event: Dict[str, PollOption] = field(init=False, repr=False, compare=False)
+    _indexed_options: Optional[List[PollOption]] = field(init=False, repr=False, compare=False)
+    # Unique voters across options, plus the (option, revision) pairs they were computed from
+    _voters: Set[int] = field(init=False, default_factory=set, repr=False, compare=False)
+    _voters_stamp: Optional[List[Tuple[PollOption, int]]] = field(init=False, default=None, repr=False, compare=False)
+    # (published_at, its ISO string); reused by to_dict while published_at is unchanged
+    _published_at_iso: Optional[Tuple[datetime, str]] = field(init=False, default=None, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._index_options()
+    
+    def _index_options(self) -> None:
+        """(Re)build the option lookups; the first option wins on duplicate keys."""
+        self._by_answer = {o.answer_id: o for o in reversed(self.options) if o.answer_id is not None}
+        self._by_event = {o.event_id: o for o in reversed(self.options)}
+        self._indexed_options = self.options
+    
+    def _option_for(self, attr: str, key: str) -> Optional[PollOption]:
+        """Look up an option by answer_id or event_id, re-indexing if options changed."""
+        lookup = self._by_answer if attr == "answer_id" else self._by_event
+        option = lookup.get(key)
+        if option is None or getattr(option, attr) != key or self._indexed_options is not self.options:
+            self._index_options()
+            lookup = self._by_answer if attr == "answer_id" else self._by_event
+            option = lookup.get(key)
+        return option
     
     @property
     def is_closed(self) -> bool:
         """Check if the poll is closed."""
         return self.closed_at is not None
     
+    def _voter_set(self) -> Set[int]:
+        """Unique voters across options, recomputed only after a vote or options change."""
+        stamp = [(option, option._revision) for option in self.options]
+        cached = self._voters_stamp
+        if cached is None or len(cached) != len(stamp) or any(
+            option is not cached_option or revision != cached_revision
+            for (option, revision), (cached_option, cached_revision) in zip(stamp, cached)
+        ):
+            voters: Set[int] = set()
+            for option in self.options:
+                voters.update(option.votes)
+            self._voters = voters
+            self._voters_stamp = stamp
+        return self._voters
+    
+    @property
+    def voter_ids(self) -> Set[int]:
+        """Unique voter IDs across options (a shared cache; do not mutate)."""
+        return self._voter_set()
+    
     @property
     def total_votes(self) -> int:
         """Get total number of unique voters."""
-        all_voters = set()
-        for option in self.options:
-            all_voters.update(option.votes)
-        return len(all_voters)
+        return len(self._voter_set())
     
     def get_user_vote(self, user_id: int) -> Optional[str]:
         """Get which option a user voted for."""
         for option in self.options:
-            if user_id in option.votes:
+            if option.has_vote(user_id):
                 return option.event_id
         return None
     
@@ -137,10 +229,12 @@ class PollMeta:
             option.remove_vote(user_id)
         
         # Add new vote
-        for option in self.options:
-            if option.event_id == event_id:
-                return option.add_vote(user_id)
-        return False
+        option = self._option_for("event_id", event_id)
+        return option.add_vote(user_id) if option else False
+
+    def get_option_by_answer_id(self, answer_id: str) -> Optional[PollOption]:
+        """Get the option mapped to a Discord answer_id, if any."""
+        return self._option_for("answer_id", answer_id)
 
     def record_vote_by_answer_id(self, user_id: int, answer_id: str) -> bool:
         """Record a vote by Discord answer_id. For attendance polls, allows multiple votes."""
@@ -150,24 +244,24 @@ class PollMeta:
                 option.remove_vote(user_id)
         
         # Add to matching option by answer_id
-        for option in self.options:
-            if option.answer_id == answer_id:
-                return option.add_vote(user_id)
-        return False
+        option = self._option_for("answer_id", answer_id)
+        return option.add_vote(user_id) if option else False
 
     def remove_vote_by_answer_id(self, user_id: int, answer_id: str) -> bool:
         """Remove a vote for the option with the given answer_id."""
-        for option in self.options:
-            if option.answer_id == answer_id:
-                return option.remove_vote(user_id)
-        return False
+        option = self._option_for("answer_id", answer_id)
+        return option.remove_vote(user_id) if option else False
     
     def get_non_voters(self, all_member_ids: List[int]) -> List[int]:
         """Get list of member IDs who haven't voted."""
-        voters = set()
-        for option in self.options:
-            voters.update(option.votes)
-        return [uid for uid in all_member_ids if uid not in voters]
+        # filterfalse keeps member order while running the membership loop in C
+        return list(filterfalse(self._voter_set().__contains__, all_member_ids))
+    
+    def _published_at_isoformat(self) -> str:
+        cached = self._published_at_iso
+        if cached is None or cached[0] is not self.published_at:
+            cached = self._published_at_iso = (self.published_at, self.published_at.isoformat())
+        return cached[1]
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
@@ -187,9 +281,9 @@ class PollMeta:
                 }
                 for opt in self.options
             ],
-            "published_at": self.published_at.isoformat(),
+            "published_at": self._published_at_isoformat(),
             "closed_at": self.closed_at.isoformat() if self.closed_at else None,
-            "reminded_users": self.reminded_users,
+            "reminded_users": list(self.reminded_users),
             "is_feedback": self.is_feedback
         }
     
@@ -200,27 +294,31 @@ class PollMeta:
             PollOption(
                 event_id=opt["event_id"],
                 title=opt["title"],
-                event_type=EventType(opt["event_type"]),
-                votes=opt["votes"],
+                event_type=_event_type(opt["event_type"]),
+                votes=list(opt["votes"]),
                 answer_id=opt.get("answer_id")
             )
             for opt in data["options"]
         ]
         
-        return cls(
+        published_at = datetime.fromisoformat(data["published_at"])
+        poll_meta = cls(
             id=data["id"],
             guild_id=data["guild_id"],
             channel_id=data["channel_id"],
             message_id=data["message_id"],
             poll_date=data["poll_date"],
             options=options,
-            published_at=datetime.fromisoformat(data["published_at"]),
+            published_at=published_at,
             closed_at=datetime.fromisoformat(data["closed_at"]) if data["closed_at"] else None,
-            reminded_users=data.get("reminded_users", []),
+            reminded_users=set(data.get("reminded_users", [])),
             is_feedback=data.get("is_feedback", False)
         )
+        # The stored string is already the ISO form; reuse it when saving back
+        poll_meta._published_at_iso = (published_at, data["published_at"])
+        return poll_meta
 
-@dataclass
+@dataclass(slots=True)
 class GuildSettings:
     """Per-guild configuration settings."""
     guild_id: int
@@ -5,15 +5,134 @@ Handles creation and export of attendance data in CSV format.
 
 # pylint: disable=import-error
 
-import pandas as pd
-from typing import Optional
-from io import StringIO, BytesIO
+import asyncio
+import csv
+import gzip
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+from io import BytesIO, TextIOWrapper
+from operator import attrgetter
 import logging
 
 from models import PollMeta
 
 logger = logging.getLogger(__name__)
 
+ATTENDANCE_HEADER = ("user_id", "username", "choice")
+USER_VOTES_HEADER = (
+    "User ID", "Poll ID", "Poll Date", "Voted For Event",
+    "Event Title", "Event Type", "Vote Timestamp",
+)
+# Exports above this size are gzipped; a little under Discord's 10 MB upload limit
+CSV_GZIP_THRESHOLD = 8 * 1024 * 1024
+
+SUMMARY_HEADER = (
+    "Date Range", "Total Polls", "Generated At", "Poll ID", "Poll Date",
+    "Event Title", "Event Type", "Votes", "Percentage", "Status",
+)
+
+def _write_csv(header: Sequence[str], rows: Iterable[Sequence]) -> BytesIO:
+    """
+    Write CSV rows straight into a UTF-8 BytesIO ready for discord.File.
+    
+    Rows are encoded as they are written, so no intermediate str copy of the
+    whole document is built; writerows consumes generators one row at a time.
+    Returns the rewound buffer.
+    """
+    buffer = BytesIO()
+    text = TextIOWrapper(buffer, encoding="utf-8", newline="")
+    writer = csv.writer(text, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()  # keep the BytesIO open after the wrapper goes away
+    buffer.seek(0)
+    return buffer
+
+def _gzip_buffer(buffer: BytesIO, compresslevel: int) -> BytesIO:
+    compressed = BytesIO(gzip.compress(buffer.getbuffer(), compresslevel=compresslevel))
+    compressed.seek(0)
+    return compressed
+
+async def gzip_csv(buffer: BytesIO, compresslevel: int = 6) -> BytesIO:
+    """
+    Gzip a CSV buffer for upload; attendance exports typically shrink 5-10x.
+    
+    Args:
+        buffer: CSV bytes as returned by the create/export functions
+        compresslevel: gzip level; lower trades ratio for speed
+    
+    Returns:
+        Rewound BytesIO with the gzip-compressed CSV
+    """
+    return await asyncio.to_thread(_gzip_buffer, buffer, compresslevel)
+
+async def prepare_csv_upload(
+    buffer: BytesIO, filename: str, threshold: int = CSV_GZIP_THRESHOLD
+) -> Tuple[BytesIO, str]:
+    """
+    Return (buffer, filename) ready for upload, gzipping only large exports.
+    
+    Plain .csv files preview in Discord and open directly in spreadsheets, so
+    only exports above threshold bytes are compressed (and renamed .csv.gz)
+    to stay under Discord's upload limit.
+    """
+    if buffer.getbuffer().nbytes <= threshold:
+        return buffer, filename
+    return await gzip_csv(buffer), f"{filename}.gz"
+
+def iter_attendance_rows(poll_meta: PollMeta, guild_members=None) -> Iterator[Tuple[str, str, str]]:
+    """Yield (user_id, username, choice) rows, keeping only the first choice per user."""
+    seen_users: set[int] = set()
+    for option in poll_meta.options:
+        for user_id in option.votes:
+            if user_id in seen_users:
+                continue
+            seen_users.add(user_id)
+
+            username = "Unknown"
+            if guild_members and user_id in guild_members:
+                username = guild_members[user_id]
+
+            yield (str(user_id), username, option.title)
+
+def iter_user_vote_rows(poll_meta: PollMeta) -> Iterator[Tuple[str, ...]]:
+    """Yield one row per (user, option) vote for the user votes export."""
+    # Per-poll values are the same on every row; format them once
+    poll_id = poll_meta.id
+    poll_date = poll_meta.poll_date
+    timestamp = poll_meta.published_at.strftime("%Y-%m-%d %H:%M:%S UTC")
+    for option in poll_meta.options:
+        event_id, title, event_type = option.event_id, option.title, option.event_type.value
+        for user_id in option.votes:
+            yield (str(user_id), poll_id, poll_date, event_id, title, event_type, timestamp)
+
+def iter_summary_rows(polls: Sequence[PollMeta], date_range: str = "") -> Iterator[Tuple]:
+    """Yield summary rows in SUMMARY_HEADER order: a report header, then each poll and its options."""
+    blank = ("",) * len(SUMMARY_HEADER)
+    generated_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    yield (date_range, len(polls), generated_at, "", "", "", "", "", "", "HEADER")
+    yield blank
+    
+    for poll in sorted(polls, key=attrgetter("poll_date")):
+        total_votes = poll.total_votes
+        yield (
+            "", "", "", poll.id, poll.poll_date,
+            f"POLL SUMMARY ({total_votes} total votes)", "", "", "",
+            "CLOSED" if poll.is_closed else "ACTIVE",
+        )
+        
+        # With no voters every vote_count is 0 too, so dividing by 1 still gives 0%
+        divisor = total_votes or 1
+        for option in sorted(poll.options, key=attrgetter("vote_count"), reverse=True):
+            percentage = option.vote_count * 100.0 / divisor
+            yield (
+                "", "", "", "", "", option.title, option.event_type.value,
+                option.vote_count, f"{percentage:.1f}%", "",
+            )
+        
+        yield blank
+
 async def create_attendance_csv(poll_meta: PollMeta, guild_members=None) -> Optional[BytesIO]:
     """
     Create a simple CSV file with attendance data matching spec format: user_id,username,choice
@@ -26,40 +145,13 @@ async def create_attendance_csv(poll_meta: PollMeta, guild_members=None) -> Opti
         BytesIO object containing CSV data, or None if error
     """
     try:
-        # Prepare data for CSV in simple format: user_id,username,choice
-        csv_data = []
+        # Encode rows off the event loop; large polls shouldn't stall the gateway
+        bytes_buffer = await asyncio.to_thread(
+            _write_csv, ATTENDANCE_HEADER, iter_attendance_rows(poll_meta, guild_members)
+        )
         
-        # Collect first choice per user to avoid duplicates
-        seen_users: set[int] = set()
-        for option in poll_meta.options:
-            for user_id in option.votes:
-                if user_id in seen_users:
-                    continue
-                seen_users.add(user_id)
-
-                username = "Unknown"
-                if guild_members and user_id in guild_members:
-                    username = guild_members[user_id]
-                
-                csv_data.append({
-                    "user_id": str(user_id),
-                    "username": username,
-                    "choice": option.title
-                })
-        
-        # Create DataFrame
-        df = pd.DataFrame(csv_data)
-        
-        # Convert to CSV
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer, index=False, encoding='utf-8')
-        
-        # Convert to BytesIO for Discord file upload
-        bytes_buffer = BytesIO()
-        bytes_buffer.write(csv_buffer.getvalue().encode('utf-8'))
-        bytes_buffer.seek(0)
-        
-        logger.info(f"Created simple CSV with {len(csv_data)} vote records for poll {poll_meta.id}")
+        # One row per unique voter
+        logger.info(f"Created simple CSV with {poll_meta.total_votes} vote records for poll {poll_meta.id}")
         return bytes_buffer
         
     except Exception as e:
@@ -78,68 +170,9 @@ async def create_summary_csv(polls: list[PollMeta], date_range: str = "") -> Opt
         BytesIO object containing CSV data, or None if error
     """
     try:
-        csv_data = []
-        
-        # Add header information
-        csv_data.append({
-            "Date Range": date_range,
-            "Total Polls": len(polls),
-            "Generated At": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
-            "Poll ID": "",
-            "Poll Date": "",
-            "Event Title": "",
-            "Event Type": "",
-            "Votes": "",
-            "Percentage": "",
-            "Status": "HEADER"
-        })
-        
-        csv_data.append({key: "" for key in csv_data[0].keys()})
-        
-        # Add data for each poll
-        for poll in sorted(polls, key=lambda x: x.poll_date):
-            # Add poll header
-            csv_data.append({
-                "Date Range": "",
-                "Total Polls": "",
-                "Generated At": "",
-                "Poll ID": poll.id,
-                "Poll Date": poll.poll_date,
-                "Event Title": f"POLL SUMMARY ({poll.total_votes} total votes)",
-                "Event Type": "",
-                "Votes": "",
-                "Percentage": "",
-                "Status": "CLOSED" if poll.is_closed else "ACTIVE"
-            })
-            
-            # Add option details
-            for option in sorted(poll.options, key=lambda x: x.vote_count, reverse=True):
-                percentage = (option.vote_count / poll.total_votes * 100) if poll.total_votes > 0 else 0
-                csv_data.append({
-                    "Date Range": "",
-                    "Total Polls": "",
-                    "Generated At": "",
-                    "Poll ID": "",
-                    "Poll Date": "",
-                    "Event Title": option.title,
-                    "Event Type": option.event_type.value,
-                    "Votes": option.vote_count,
-                    "Percentage": f"{percentage:.1f}%",
-                    "Status": ""
-                })
-            
-            # Add separator
-            csv_data.append({key: "" for key in csv_data[0].keys()})
-        
-        # Create DataFrame and export
-        df = pd.DataFrame(csv_data)
-        
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer, index=False, encoding='utf-8')
-        
-        bytes_buffer = BytesIO()
-        bytes_buffer.write(csv_buffer.getvalue().encode('utf-8'))
-        bytes_buffer.seek(0)
+        bytes_buffer = await asyncio.to_thread(
+            _write_csv, SUMMARY_HEADER, iter_summary_rows(polls, date_range)
+        )
         
         logger.info(f"Created summary CSV for {len(polls)} polls")
         return bytes_buffer
@@ -189,48 +222,15 @@ async def export_user_votes(poll_meta: PollMeta) -> Optional[BytesIO]:
             logger.error(f"Invalid poll data for CSV export: {poll_meta.id}")
             return None
         
-        user_data = []
-        
-        # Create a row for each user who voted
-        for option in poll_meta.options:
-            for user_id in option.votes:
-                user_data.append({
-                    "User ID": str(user_id),
-                    "Poll ID": poll_meta.id,
-                    "Poll Date": poll_meta.poll_date,
-                    "Voted For Event": option.event_id,
-                    "Event Title": option.title,
-                    "Event Type": option.event_type.value,
-                    "Vote Timestamp": poll_meta.published_at.strftime("%Y-%m-%d %H:%M:%S UTC")
-                })
-        
-        if not user_data:
-            # No votes, create empty structure
-            user_data.append({
-                "User ID": "No votes received",
-                "Poll ID": poll_meta.id,
-                "Poll Date": poll_meta.poll_date,
-                "Voted For Event": "",
-                "Event Title": "",
-                "Event Type": "",
-                "Vote Timestamp": ""
-            })
-        
-        # Create DataFrame
-        df = pd.DataFrame(user_data)
-        
-        # Sort by User ID
-        if len(user_data) > 1 or user_data[0]["User ID"] != "No votes received":
-            df = df.sort_values("User ID")
-        
-        # Export to CSV
-        csv_buffer = StringIO()
-        df.to_csv(csv_buffer, index=False, encoding='utf-8')
+        if not any(option.votes for option in poll_meta.options):
+            # No votes: a header-only file is tiny, so write it inline
+            bytes_buffer = _write_csv(USER_VOTES_HEADER, ())
+            return bytes_buffer
         
-        bytes_buffer = BytesIO()
-        bytes_buffer.write(csv_buffer.getvalue().encode('utf-8'))
-        bytes_buffer.seek(0)
+        # Sort numerically by User ID (Discord snowflakes are all digits)
+        rows = sorted(iter_user_vote_rows(poll_meta), key=lambda row: int(row[0]))
         
+        bytes_buffer = await asyncio.to_thread(_write_csv, USER_VOTES_HEADER, rows)
         return bytes_buffer
         
     except Exception as e:
@@ -2,25 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import timedelta
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Tuple
 
 import discord  # type: ignore
 
-from models import Event, PollMeta, PollOption
-from storage import get_events_by_date, save_poll, get_polls_by_guild
+from models import Event, EventType, PollMeta, PollOption
+from storage import get_events_by_date, save_poll_batch, has_active_attendance_poll
 from utils.time import tz_tomorrow
-from utils.discord import ensure_can_send
+from utils.discord import ensure_can_send, map_answer_ids
 
 logger = logging.getLogger(__name__)
 
+# Option label prefix per event type, e.g. "Lecture" for EventType.LECTURE
+_EVENT_TYPE_LABELS: Dict[EventType, str] = {event_type: event_type.value.title() for event_type in EventType}
 
-def chunk_events(events: List[Event], max_size: int = 10) -> List[List[Event]]:
-    chunks: List[List[Event]] = []
-    for i in range(0, len(events), max_size):
-        chunks.append(events[i : i + max_size])
-    return chunks
+
+def chunk_events(events: Iterable[Event], max_size: int = 10) -> List[List[Event]]:
+    # Returns a list because publishing needs the chunk count for "(Poll i/N)" labels
+    it = iter(events)
+    return list(iter(lambda: list(islice(it, max_size)), []))
 
 
 async def publish_attendance_poll(
@@ -34,12 +38,19 @@ async def publish_attendance_poll(
         timezone = guild_settings.get("timezone", "Europe/Helsinki")
         tomorrow_date = tz_tomorrow(timezone)
 
-        # Get tomorrow's events for this guild
-        events_data = await get_events_by_date(tomorrow_date, guild_id=guild.id)
-        events = [Event.from_dict(event) for event in events_data]
+        # Get tomorrow's events for this guild, checking for existing polls at the same time
+        events_data, already_published = await asyncio.gather(
+            get_events_by_date(tomorrow_date, guild_id=guild.id),
+            has_active_attendance_poll(guild.id, tomorrow_date),
+            return_exceptions=True,
+        )
+        if isinstance(events_data, BaseException):
+            raise events_data
 
-        # Filter pollable events
-        pollable_events = [e for e in events if e.is_pollable and not e.feedback_only]
+        # Build each Event once and filter pollable events in the same pass
+        pollable_events = [
+            e for e in map(Event.from_dict, events_data) if e.is_pollable and not e.feedback_only
+        ]
 
         if not pollable_events:
             logger.info(
@@ -48,21 +59,12 @@ async def publish_attendance_poll(
             return []
 
         # Deduplicate: if there are already active attendance polls for this date, skip
-        try:
-            existing_polls = await get_polls_by_guild(guild.id)
-            if any(
-                (not poll.get("is_feedback", False))
-                and poll.get("poll_date") == tomorrow_date
-                and poll.get("closed_at") is None
-                for poll in existing_polls
-            ):
-                logger.info(
-                    f"Attendance poll(s) for {tomorrow_date} already exist in guild {guild.id}; skipping publish"
-                )
-                return []
-        except Exception:
-            # If storage lookup fails, proceed to avoid blocking publish entirely
-            pass
+        # If storage lookup failed, proceed to avoid blocking publish entirely
+        if already_published is True:
+            logger.info(
+                f"Attendance poll(s) for {tomorrow_date} already exist in guild {guild.id}; skipping publish"
+            )
+            return []
 
         poll_channel_id = guild_settings.get("poll_channel_id")
         if not poll_channel_id:
@@ -75,8 +77,9 @@ async def publish_attendance_poll(
             return []
 
         event_chunks = chunk_events(pollable_events, max_size=10)
-        created_polls: List[PollMeta] = []
 
+        # Build every chunk's poll up front, then send them in order
+        prepared: List[Tuple[discord.Poll, List[PollOption]]] = []
         for chunk_index, event_chunk in enumerate(event_chunks):
             poll_question = f"🗳️ Choose your attendance for {tomorrow_date}"
             if len(event_chunks) > 1:
@@ -88,7 +91,7 @@ async def publish_attendance_poll(
 
             poll_options: List[PollOption] = []
             for event in event_chunk:
-                option_text = f"{event.event_type.value.title()}: {event.title}"
+                option_text = f"{_EVENT_TYPE_LABELS[event.event_type]}: {event.title}"
                 poll.add_answer(text=option_text)
                 poll_options.append(
                     PollOption(
@@ -97,18 +100,19 @@ async def publish_attendance_poll(
                         event_type=event.event_type,
                     )
                 )
+            prepared.append((poll, poll_options))
 
-            message = await poll_channel.send(poll=poll)
-
-            # Map Discord answers to our options by title to capture answer_id
+        created_polls: List[PollMeta] = []
+        # One at a time, so "(Poll i/N)" appear in the channel in order; there are
+        # only a few chunks per day
+        for poll, poll_options in prepared:
             try:
-                answer_ids_by_text = {
-                    a.text: str(a.id) for a in (message.poll.answers or [])
-                }
-                for opt in poll_options:
-                    opt.answer_id = answer_ids_by_text.get(opt.title)
+                message = await poll_channel.send(poll=poll)
             except Exception as e:
-                logger.debug(f"Could not map answer IDs for attendance poll: {e}")
+                logger.error(f"Failed to send attendance poll for {tomorrow_date}: {e}")
+                continue
+
+            map_answer_ids(message, poll_options)
 
             poll_meta = PollMeta(
                 id=str(message.id),
@@ -118,12 +122,15 @@ async def publish_attendance_poll(
                 poll_date=tomorrow_date,
                 options=poll_options,
             )
-
-            await save_poll(poll_meta.to_dict())
             created_polls.append(poll_meta)
 
+            # Record each poll as soon as it is posted, so a crash or a hung later send
+            # can't leave a posted poll that closing and reminders never see
+            if not await save_poll_batch([poll_meta.to_dict()]):
+                logger.error(f"Failed to save attendance poll {poll_meta.id}")
+
             logger.info(
-                f"Created poll {poll_meta.id} for {len(event_chunk)} events"
+                f"Created poll {poll_meta.id} for {len(poll_options)} events"
             )
 
         logger.info(f"Published {len(created_polls)} poll(s) for {tomorrow_date}")
@@ -2,44 +2,97 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timezone
+from operator import attrgetter
 from typing import Any, Dict, List
 
 import discord  # type: ignore
 
-from models import PollMeta
-from storage import load_polls, save_poll, delete_poll
-from utils.time import tz_today, to_unix_timestamp, get_poll_closing_date
+from models import PollMeta, PollOption
+from storage import get_active_poll_metas, discard_poll_meta, save_poll, save_poll_batch, delete_poll
+from utils.time import tz_today, get_poll_closing_date
 from services.csv_service import create_attendance_csv
 
 logger = logging.getLogger(__name__)
 
+# Polls closed at once per guild; each close makes several Discord API calls
+CLOSE_CONCURRENCY = 3
+# Voter lists paged at once per poll; they share the channel's rate-limit bucket
+VOTER_FETCH_CONCURRENCY = 5
+
+
+async def _collect_voter_ids(answer: discord.PollAnswer, semaphore: asyncio.Semaphore) -> List[int]:
+    async with semaphore:
+        return [voter.id async for voter in answer.voters()]
+
+
+def _no_votes_embed(poll_meta: PollMeta) -> discord.Embed:
+    embed = discord.Embed(
+        title=f"📊 Poll Results - {poll_meta.poll_date}",
+        description="Attendance poll closed with no votes",
+        color=0x00FF00,
+    )
+    # <t:...> markup isn't rendered in footers; the embed timestamp shows in local time
+    embed.set_footer(text="Poll closed")
+    embed.timestamp = poll_meta.closed_at
+    return embed
+
+
+async def _message_has_no_poll(channel: discord.abc.Messageable, message_id: int) -> bool:
+    try:
+        message = await channel.fetch_message(message_id)
+    except discord.NotFound:
+        return True
+    except discord.HTTPException:
+        return False
+    return message.poll is None
+
+
+async def _persist_closed(poll_meta: PollMeta, save: bool) -> None:
+    if save:
+        await save_poll(poll_meta.to_dict())
+
 
 async def close_poll(
-    bot: discord.Client, guild: discord.Guild, poll_meta: PollMeta, guild_settings: Dict[str, Any]
+    bot: discord.Client,
+    guild: discord.Guild,
+    poll_meta: PollMeta,
+    guild_settings: Dict[str, Any],
+    *,
+    save: bool = True,
 ) -> bool:
+    # save=False leaves persisting the closed poll to the caller, so closing a
+    # batch of polls can store them all with one write of the polls file
     try:
         poll_channel = guild.get_channel(poll_meta.channel_id)
         if not poll_channel:
             return False
 
+        # Ending the poll only needs the channel and message IDs, and the response
+        # carries the final tallies, so no separate fetch_message round-trip is needed
         try:
-            poll_message = await poll_channel.fetch_message(poll_meta.message_id)
-            if not poll_message or not poll_message.poll:
-                # Orphan record: remove from storage
-                await delete_poll(poll_meta.id)
-                return False
+            ended_message = await poll_channel.get_partial_message(poll_meta.message_id).end_poll()
         except discord.NotFound:
+            # Orphan record: the message is gone, remove it from storage
             await delete_poll(poll_meta.id)
             return False
-
-        try:
-            ended_poll = await poll_message.poll.end()
+        except discord.HTTPException as e:
+            # Ending a message without a poll is rejected with a 400; only then is
+            # the message fetched to tell an orphan record from other failures
+            if e.status == 400 and await _message_has_no_poll(poll_channel, poll_meta.message_id):
+                # Orphan record: the message no longer carries a poll
+                await delete_poll(poll_meta.id)
+                return False
+            logger.error(f"Error ending poll {poll_meta.id}: {e}")
+            return False
         except Exception as e:
             logger.error(f"Error ending poll {poll_meta.id}: {e}")
             return False
 
+        ended_poll = ended_message.poll
+
         poll_meta.closed_at = datetime.now(timezone.utc)
 
         organiser_channel_id = guild_settings.get("organiser_channel_id")
@@ -52,7 +105,21 @@ async def close_poll(
             logger.error(f"Organiser channel {organiser_channel_id} not found in guild {guild.id}")
             return False
 
-        sorted_answers = sorted(ended_poll.answers, key=lambda a: a.vote_count, reverse=True)
+        # Counts are only approximate until Discord finalises the poll, so skip the
+        # voter fetch only when the final counts say no answer got a vote
+        if (
+            ended_poll.answers
+            and ended_poll.is_finalized()
+            and not any(answer.vote_count for answer in ended_poll.answers)
+        ):
+            # Nothing to tally: skip the per-answer voter pagination and the empty CSV
+            for option in poll_meta.options:
+                option.set_votes([])
+            await organiser_channel.send(embed=_no_votes_embed(poll_meta))
+            await _persist_closed(poll_meta, save)
+            return True
+
+        sorted_answers = sorted(ended_poll.answers, key=attrgetter("vote_count"), reverse=True)
 
         results_text = ""
         for i, answer in enumerate(sorted_answers):
@@ -60,11 +127,25 @@ async def close_poll(
             emoji = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else "📝"
             results_text += f"{emoji} {answer.text}: **{answer.vote_count}** votes ({percentage:.1f}%)\n"
 
-            for option in poll_meta.options:
-                if option.title == answer.text:
-                    voters = [voter.id async for voter in answer.voters()]
-                    option.votes = voters
-                    break
+        # Join answers to options on the recorded answer_id; polls stored before
+        # answer ids were captured fall back to matching the answer text
+        option_by_title: Dict[str, PollOption] = {}
+        for option in poll_meta.options:
+            if option.answer_id is None:
+                option_by_title.setdefault(option.title, option)
+        matched = []
+        for answer in sorted_answers:
+            option = poll_meta.get_option_by_answer_id(str(answer.id)) or option_by_title.get(answer.text)
+            if option is not None:
+                matched.append((answer, option))
+
+        # Pull the final voter lists for all answers concurrently (each is a paginated API call)
+        semaphore = asyncio.Semaphore(VOTER_FETCH_CONCURRENCY)
+        voter_lists = await asyncio.gather(*(_collect_voter_ids(answer, semaphore) for answer, _ in matched))
+        # The collected lists become the options' votes directly, and the CSV
+        # below streams rows from them, so each voter ID is held only once
+        for (_, option), voters in zip(matched, voter_lists):
+            option.set_votes(voters)
 
         if results_text:
             embed = discord.Embed(
@@ -75,8 +156,8 @@ async def close_poll(
             embed.add_field(name="📈 Total Votes", value=str(ended_poll.total_votes), inline=True)
             embed.add_field(name="📝 Options", value=str(len(ended_poll.answers)), inline=True)
             embed.add_field(name="🏆 Results", value=results_text, inline=False)
-            closed_timestamp = to_unix_timestamp(poll_meta.closed_at)
-            embed.set_footer(text=f"Poll closed at <t:{closed_timestamp}:F>")
+            embed.set_footer(text="Poll closed")
+            embed.timestamp = poll_meta.closed_at
 
             await organiser_channel.send(embed=embed)
 
@@ -88,7 +169,7 @@ async def close_poll(
                 )
                 await organiser_channel.send(content="📄 Detailed attendance data:", file=csv_file)
 
-            await save_poll(poll_meta.to_dict())
+            await _persist_closed(poll_meta, save)
             return True
         return False
     except Exception as e:
@@ -107,14 +188,9 @@ async def close_all_active_polls(
 
         # get_poll_closing_date now imported from utils.time
 
-        all_polls = await load_polls()
-        active_polls = [
-            PollMeta.from_dict(poll)
-            for poll in all_polls.values()
-            if poll["guild_id"] == guild.id and poll["closed_at"] is None
-        ]
+        active_polls = await get_active_poll_metas(guild.id)
 
-        closed_count = 0
+        due_polls: List[PollMeta] = []
         for poll_meta in active_polls:
             should_close = False
             if poll_meta.is_feedback:
@@ -133,10 +209,33 @@ async def close_all_active_polls(
                 if expected_close_date == today_date:
                     should_close = True
 
-            if should_close and await close_poll(bot, guild, poll_meta, guild_settings):
-                closed_count += 1
+            if should_close:
+                due_polls.append(poll_meta)
 
-        return closed_count
+        semaphore = asyncio.Semaphore(CLOSE_CONCURRENCY)
+
+        async def _close_bounded(poll_meta: PollMeta) -> bool:
+            async with semaphore:
+                return await close_poll(bot, guild, poll_meta, guild_settings, save=False)
+
+        # close_poll logs its own failures, so exceptions only need to not count as closed
+        results = await asyncio.gather(
+            *(_close_bounded(poll_meta) for poll_meta in due_polls), return_exceptions=True
+        )
+        closed_polls = []
+        for poll_meta, result in zip(due_polls, results):
+            if result is True:
+                closed_polls.append(poll_meta)
+            else:
+                # A failed close may have set closed_at or votes on the shared cached
+                # object; drop it so the next run starts from what is stored
+                discard_poll_meta(poll_meta.id)
+        # All closed polls go out in one direct write, not via the write-behind queue
+        if closed_polls and not await save_poll_batch([poll_meta.to_dict() for poll_meta in closed_polls]):
+            logger.error(f"Failed to save {len(closed_polls)} closed poll(s) for guild {guild.id}")
+            for poll_meta in closed_polls:
+                discard_poll_meta(poll_meta.id)
+        return len(closed_polls)
     except Exception as e:
         logger.error(f"Error closing active polls for guild {guild.id}: {e}")
         return 0
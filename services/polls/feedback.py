@@ -2,16 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections import OrderedDict
 from datetime import timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import discord  # type: ignore
 
 from models import Event, EventType, PollMeta, PollOption
-from storage import get_events_by_date, save_poll, get_polls_by_guild
+from storage import get_events_by_date, save_poll, save_poll_batch, get_active_feedback_event_ids
 from utils.time import tz_today
-from utils.discord import ensure_can_send
+from utils.discord import ensure_can_send, map_answer_ids
 
 logger = logging.getLogger(__name__)
 
@@ -63,19 +66,75 @@ FEEDBACK_OPTIONS: Dict[EventType, List[str]] = {
     ],
 }
 
+# Immutable (answer text, event type) pairs per event type, built once at import.
+# PollOptions hold per-poll votes, so only these templates are shared between polls.
+_FEEDBACK_TEMPLATES: Dict[EventType, Tuple[Tuple[str, EventType], ...]] = {
+    event_type: tuple((text, event_type) for text in texts)
+    for event_type, texts in FEEDBACK_OPTIONS.items()
+}
+
+
+_EVENT_TYPE_DISPLAY_NAMES: Dict[EventType, str] = {
+    EventType.CONTEST: "Contest",
+    EventType.CONTEST_EDITORIAL: "Contest Analysis",
+    EventType.EXTRA_LECTURE: "Extra Lecture",
+    EventType.EVENING_ACTIVITY: "Evening Activity",
+    EventType.LECTURE: "Lecture",
+    EventType.CYPRUS_CONTEST: "🇨🇾 Cyprus Contest",
+    EventType.CYPRUS_EDITORIAL: "🇨🇾 Cyprus Editorial",
+}
+
+
+# Event types that only ever get feedback polls, never attendance polls
+_FEEDBACK_ONLY_EVENT_TYPES = frozenset({
+    EventType.CONTEST_EDITORIAL, EventType.CYPRUS_CONTEST, EventType.CYPRUS_EDITORIAL,
+})
+
+
+# Recently created feedback polls, keyed by (guild_id, event_id, poll_date), so a
+# publish that fires twice in quick succession cannot post a second poll before
+# the first one reaches storage. Values are (expires_at, message_id); message_id
+# is None while the first send is still in flight.
+FEEDBACK_IDEMPOTENCY_TTL = 600.0
+FEEDBACK_IDEMPOTENCY_MAX = 256
+_recent_feedback_polls: "OrderedDict[Tuple[int, str, str], Tuple[float, Optional[int]]]" = OrderedDict()
+
+
+async def _claim_feedback_poll(
+    poll_channel: discord.abc.Messageable, key: Tuple[int, str, str]
+) -> bool:
+    """Reserve key for a new feedback poll; False if one was created for it recently."""
+    now = time.monotonic()
+    # Entries share one TTL, so insertion order is expiry order
+    while _recent_feedback_polls and next(iter(_recent_feedback_polls.values()))[0] <= now:
+        _recent_feedback_polls.popitem(last=False)
+
+    entry = _recent_feedback_polls.get(key)
+    if entry is not None:
+        message_id = entry[1]
+        if message_id is None:
+            return False
+        try:
+            await poll_channel.fetch_message(message_id)
+            return False
+        except discord.NotFound:
+            # The earlier poll was deleted; allow posting it again
+            pass
+        except Exception:
+            return False
+        if _recent_feedback_polls.get(key) is not entry:
+            return False
+
+    _recent_feedback_polls[key] = (now + FEEDBACK_IDEMPOTENCY_TTL, None)
+    _recent_feedback_polls.move_to_end(key)
+    while len(_recent_feedback_polls) > FEEDBACK_IDEMPOTENCY_MAX:
+        _recent_feedback_polls.popitem(last=False)
+    return True
+
 
 def get_event_type_display_name(event_type: EventType) -> str:
     """Return human-readable event type name for feedback poll titles."""
-    display_names: Dict[EventType, str] = {
-        EventType.CONTEST: "Contest",
-        EventType.CONTEST_EDITORIAL: "Contest Analysis",
-        EventType.EXTRA_LECTURE: "Extra Lecture",
-        EventType.EVENING_ACTIVITY: "Evening Activity",
-        EventType.LECTURE: "Lecture",
-        EventType.CYPRUS_CONTEST: "🇨🇾 Cyprus Contest",
-        EventType.CYPRUS_EDITORIAL: "🇨🇾 Cyprus Editorial",
-    }
-    return display_names.get(event_type, event_type.value.title())
+    return _EVENT_TYPE_DISPLAY_NAMES[event_type]
 
 
 async def publish_feedback_polls(
@@ -87,15 +146,23 @@ async def publish_feedback_polls(
         timezone = guild_settings.get("timezone", "Europe/Helsinki")
         today_date = tz_today(timezone)
 
-        events_data = await get_events_by_date(today_date, guild_id=guild.id)
-        events = [Event.from_dict(event) for event in events_data]
+        # The events and the existing feedback polls are independent reads; fetch them together
+        events_data, existing_feedback_event_ids = await asyncio.gather(
+            get_events_by_date(today_date, guild_id=guild.id),
+            get_active_feedback_event_ids(guild.id, today_date),
+            return_exceptions=True,
+        )
+        if isinstance(events_data, BaseException):
+            raise events_data
+        if isinstance(existing_feedback_event_ids, BaseException):
+            # If storage lookup fails, proceed without dedupe
+            existing_feedback_event_ids = set()
 
-        # Include standard pollable events (lecture/contest), contest editorials, and Cyprus events (all feedback-only)
+        # Include standard pollable events (lecture/contest), contest editorials, and Cyprus events (all feedback-only).
+        # Each Event is built once and filtered in the same pass.
         pollable_events = [
-            e for e in events
-            if (e.is_pollable and not e.feedback_only) or e.event_type in [
-                EventType.CONTEST_EDITORIAL, EventType.CYPRUS_CONTEST, EventType.CYPRUS_EDITORIAL
-            ]
+            e for e in map(Event.from_dict, events_data)
+            if (e.is_pollable and not e.feedback_only) or e.event_type in _FEEDBACK_ONLY_EVENT_TYPES
         ]
         if not pollable_events:
             logger.info(
@@ -103,24 +170,6 @@ async def publish_feedback_polls(
             )
             return []
 
-        # Build a set of event_ids that already have active feedback polls for today
-        existing_feedback_event_ids: set[str] = set()
-        try:
-            existing_polls = await get_polls_by_guild(guild.id)
-            for poll in existing_polls:
-                if (
-                    poll.get("is_feedback", False)
-                    and poll.get("poll_date") == today_date
-                    and poll.get("closed_at") is None
-                ):
-                    for opt in poll.get("options", []) or []:
-                        ev_id = opt.get("event_id")
-                        if ev_id:
-                            existing_feedback_event_ids.add(ev_id)
-        except Exception:
-            # If storage lookup fails, proceed without dedupe
-            pass
-
         created_polls: List[PollMeta] = []
         for event in pollable_events:
             if event.id in existing_feedback_event_ids:
@@ -134,13 +183,17 @@ async def publish_feedback_polls(
                 title=f"{readable_type}: {event.title}",
                 event_type=event.event_type,
             )
-            feedback_poll = await create_feedback_poll(guild, event_option, guild_settings, today_date)
+            feedback_poll = await create_feedback_poll(guild, event_option, guild_settings, today_date, save=False)
             if feedback_poll:
                 created_polls.append(feedback_poll)
                 logger.info(
                     f"Created feedback poll for event {event.id}: {event.title}"
                 )
 
+        # Store every created poll with one write of the polls file
+        if created_polls:
+            await save_poll_batch([poll.to_dict() for poll in created_polls])
+
         logger.info(f"Published {len(created_polls)} feedback poll(s) for {today_date}")
         return created_polls
     except Exception as e:
@@ -153,7 +206,12 @@ async def create_feedback_poll(
     event_option: PollOption,
     guild_settings: Dict[str, Any],
     poll_date: str,
+    *,
+    save: bool = True,
 ) -> Optional[PollMeta]:
+    # save=False leaves persisting the returned poll to the caller, e.g. to batch several
+    key = (guild.id, event_option.event_id, poll_date)
+    pending = False
     try:
         poll_channel_id = guild_settings.get("poll_channel_id")
         poll_channel = await ensure_can_send(guild, poll_channel_id) if poll_channel_id else None
@@ -161,33 +219,33 @@ async def create_feedback_poll(
             logger.warning(f"Cannot send messages in feedback channel {poll_channel_id} (missing or no perms)")
             return None
 
-        feedback_texts = FEEDBACK_OPTIONS.get(event_option.event_type)
-        if not feedback_texts:
+        feedback_templates = _FEEDBACK_TEMPLATES.get(event_option.event_type)
+        if not feedback_templates:
             return None
 
         question = f"📝 Feedback for {event_option.title}"
         poll = discord.Poll(question=question, multiple=False, duration=timedelta(hours=24))
 
-        poll_options_meta: List[PollOption] = []
-        for text in feedback_texts:
+        event_id = event_option.event_id
+        poll_options_meta = [
+            PollOption(event_id=event_id, title=text, event_type=event_type)
+            for text, event_type in feedback_templates
+        ]
+        # discord.PollAnswer objects belong to the Poll they are added to, so
+        # only the text templates are shared; answers are added per poll
+        for text, _ in feedback_templates:
             poll.add_answer(text=text)
-            poll_options_meta.append(
-                PollOption(
-                    event_id=event_option.event_id,
-                    title=text,
-                    event_type=event_option.event_type,
-                )
-            )
+
+        if not await _claim_feedback_poll(poll_channel, key):
+            logger.info(f"Feedback poll for event {event_option.event_id} was just created; skipping")
+            return None
+        pending = True
 
         message = await poll_channel.send(poll=poll)
+        _recent_feedback_polls[key] = (time.monotonic() + FEEDBACK_IDEMPOTENCY_TTL, message.id)
+        pending = False
 
-        # Map Discord answers to our options by title to capture answer_id
-        try:
-            answer_ids_by_text = {a.text: str(a.id) for a in (message.poll.answers or [])}
-            for opt in poll_options_meta:
-                opt.answer_id = answer_ids_by_text.get(opt.title)
-        except Exception as e:
-            logger.debug(f"Could not map answer IDs for feedback poll: {e}")
+        map_answer_ids(message, poll_options_meta)
 
         feedback_meta = PollMeta(
             id=str(message.id),
@@ -199,9 +257,13 @@ async def create_feedback_poll(
             is_feedback=True,
         )
 
-        await save_poll(feedback_meta.to_dict())
+        if save:
+            await save_poll(feedback_meta.to_dict())
         return feedback_meta
     except Exception as e:
+        if pending:
+            # Nothing was posted; release the reservation so a retry can post the poll
+            _recent_feedback_polls.pop(key, None)
         logger.error(
             f"Failed to create feedback poll for event {event_option.event_id}: {e}"
         )
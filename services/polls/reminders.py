@@ -10,12 +10,37 @@ from typing import Any, Dict, List
 import discord  # type: ignore
 
 from models import PollMeta
-from storage import load_polls, save_poll, delete_poll
+from storage import (
+    get_active_poll_metas, queue_reminded_user, flush_poll_writes, delete_poll, load_dm_channels, save_dm_channels,
+)
 from utils.time import tz_today, get_discord_timestamp, get_poll_closing_date
 from utils.discord import create_reminder_embed
+from utils.ratelimit import TokenBucket, backoff_delay
 
 logger = logging.getLogger(__name__)
 
+# Local pacing for DM sends: 5 per second, a bit faster than the old 0.3s-sleep
+# loop. Discord's actual limit is enforced by its 429 responses, which are
+# retried after their Retry-After (see backoff_delay below)
+DM_RATE = 5
+DM_RATE_PERIOD = 1.0
+# Tries per DM before a rate-limited send counts as failed
+DM_SEND_ATTEMPTS = 4
+# DM sends in flight at once unless the REMINDER_CONCURRENCY env var says otherwise
+DEFAULT_DM_CONCURRENCY = 8
+
+
+def _dm_concurrency() -> int:
+    """Reminder DMs in flight at once: REMINDER_CONCURRENCY (at least 1) or the default."""
+    value = os.getenv("REMINDER_CONCURRENCY")
+    if not value:
+        return DEFAULT_DM_CONCURRENCY
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning(f"Invalid REMINDER_CONCURRENCY '{value}'; using {DEFAULT_DM_CONCURRENCY}")
+        return DEFAULT_DM_CONCURRENCY
+
 
 async def send_reminders(
     bot: discord.Client, guild: discord.Guild, guild_settings: Dict[str, Any], poll_ids: List[str] | None = None
@@ -23,16 +48,14 @@ async def send_reminders(
     try:
         logger.info(f"Sending poll reminders for guild {guild.id}")
 
-        all_polls = await load_polls()
         active_polls: List[PollMeta] = [
-            PollMeta.from_dict(poll)
-            for poll in all_polls.values()
-            if poll["guild_id"] == guild.id and poll["closed_at"] is None and not poll.get("is_feedback", False)
+            pm for pm in await get_active_poll_metas(guild.id) if not pm.is_feedback
         ]
 
         # Optionally narrow to specific polls (e.g., newly created by a test command)
         if poll_ids:
-            active_polls = [pm for pm in active_polls if pm.id in set(poll_ids)]
+            wanted_ids = set(poll_ids)
+            active_polls = [pm for pm in active_polls if pm.id in wanted_ids]
 
         if not active_polls:
             logger.info(f"No active polls for guild {guild.id}")
@@ -40,6 +63,8 @@ async def send_reminders(
 
         # Clean up orphan polls whose Discord messages were deleted
         cleaned_active_polls: List[PollMeta] = []
+        # Channels resolved here are reused when building the reminder embeds
+        poll_channels: Dict[str, Any] = {}
         removed_orphans = 0
         for pm in active_polls:
             poll_channel = guild.get_channel(pm.channel_id)
@@ -60,6 +85,7 @@ async def send_reminders(
             except Exception:
                 # If fetch fails for other reasons, skip cleanup and avoid blocking reminders entirely
                 pass
+            poll_channels[pm.id] = poll_channel
             cleaned_active_polls.append(pm)
 
         if removed_orphans:
@@ -79,80 +105,125 @@ async def send_reminders(
         # Get configured student role name
         configured_student_role_name = guild_settings.get("student_role_name", "student")
         
-        student_role = next(
-            (r for r in guild.roles if r.name.lower() == configured_student_role_name.lower() or (student_role_id and r.id == student_role_id)),
-            None,
+        # An ID lookup is O(1); fall back to matching the configured name
+        role_name = configured_student_role_name.casefold()
+        student_role = (student_role_id and guild.get_role(student_role_id)) or discord.utils.find(
+            lambda r: r.name.casefold() == role_name, guild.roles
         )
         if not student_role:
             logger.warning(f"Student role not found in guild {guild.id}")
             return {"sent": 0, "failed": 0, "already_reminded": 0, "total_members": 0, "total_polls": len(active_polls)}
 
-        members = [m for m in guild.members if not m.bot and student_role in m.roles]
+        # role.members scans the guild's whole member cache, so read it once here;
+        # keyed by id so the DM step reuses these objects instead of guild.get_member
+        members_by_id = {m.id: m for m in student_role.members if not m.bot}
 
-        sent = failed = already = 0
+        already = 0
 
-        member_ids = [m.id for m in members]
+        # Set arithmetic per poll instead of per-member membership scans
+        member_ids = members_by_id.keys()
         user_to_polls: Dict[int, List[PollMeta]] = {}
         for pm in active_polls:
-            non_voters = pm.get_non_voters(member_ids)
-            for uid in non_voters:
-                if uid in pm.reminded_users:
-                    already += 1
-                    continue
+            non_voters = member_ids - pm.voter_ids
+            already += len(non_voters & pm.reminded_users)
+            for uid in non_voters - pm.reminded_users:
                 user_to_polls.setdefault(uid, []).append(pm)
 
-        for user_id, polls_for_user in user_to_polls.items():
-            try:
-                user = guild.get_member(user_id)
-                if not user:
-                    continue
+        close_time = guild_settings.get("poll_close_time", "09:00")
+        publish_time = guild_settings.get("poll_publish_time", "14:30")
+        timezone = guild_settings.get("timezone", "Europe/Helsinki")
+
+        def _build_reminder_embed(poll_meta: PollMeta) -> discord.Embed:
+            poll_channel = poll_channels.get(poll_meta.id)
+
+            # Calculate the correct deadline date using the same logic as poll closing
+            deadline_date = get_poll_closing_date(poll_meta.poll_date, publish_time, close_time, timezone)
+            deadline_ts = get_discord_timestamp(deadline_date, close_time, timezone, style="F")
+
+            # Without a poll channel the reminder just omits the channel link
+            return create_reminder_embed(poll_channel.id if poll_channel else None, deadline_ts, timezone)
+
+        # Each DM describes the user's first pending poll; the embed only depends on
+        # that poll, so build one per poll up front and share it across recipients
+        reminder_embeds: Dict[str, discord.Embed] = {}
+        for polls_for_user in user_to_polls.values():
+            first_poll = polls_for_user[0]
+            if first_poll.id not in reminder_embeds:
+                reminder_embeds[first_poll.id] = _build_reminder_embed(first_poll)
+
+        # DMs are I/O-bound, so send them concurrently: the semaphore caps requests
+        # in flight and the bucket paces them to Discord's DM rate limit
+        semaphore = asyncio.Semaphore(_dm_concurrency())
+        bucket = TokenBucket(DM_RATE, DM_RATE_PERIOD)
+
+        # DM channel ids persist across restarts, so repeat reminders can post to a
+        # partial channel instead of calling the (rate-limited) create-DM endpoint
+        dm_channels = await load_dm_channels()
+        dm_channels_changed = False
+
+        async def _dm_channel(user: discord.Member, fresh: bool = False) -> discord.abc.Messageable:
+            # fresh=True skips both caches and asks Discord for the DM channel again
+            nonlocal dm_channels_changed
+            channel_id = None if fresh else dm_channels.get(str(user.id))
+            if channel_id:
+                return bot.get_partial_messageable(channel_id, type=discord.ChannelType.private)
+            channel = await user.create_dm() if fresh else (user.dm_channel or await user.create_dm())
+            dm_channels[str(user.id)] = channel.id
+            dm_channels_changed = True
+            return channel
+
+        async def _send_one(user_id: int, polls_for_user: List[PollMeta]) -> str | None:
+            """DM one user; returns "sent", "failed", or None when the member is gone."""
+            nonlocal dm_channels_changed
+            user = members_by_id.get(user_id)
+            if not user:
+                return None
+
+            embed = reminder_embeds[polls_for_user[0].id]
+            fresh_channel = False
+            for attempt in range(DM_SEND_ATTEMPTS):
+                try:
+                    async with semaphore, bucket:
+                        await (await _dm_channel(user, fresh_channel)).send(embed=embed)
+                    for pm in polls_for_user:
+                        pm.reminded_users.add(user_id)
+                        # Persist progress as it happens; only the id is queued and merged
+                        # into the stored poll, so votes saved meanwhile aren't overwritten
+                        queue_reminded_user(pm.id, user_id)
+                    return "sent"
+                except discord.Forbidden:
+                    return "failed"
+                except discord.NotFound:
+                    # Stale cached DM channel: forget it and retry once on a freshly created one
+                    if dm_channels.pop(str(user_id), None) is not None:
+                        dm_channels_changed = True
+                    if fresh_channel:
+                        return "failed"
+                    fresh_channel = True
+                except discord.HTTPException as e:
+                    if getattr(e, "status", None) != 429 or attempt == DM_SEND_ATTEMPTS - 1:
+                        return "failed"
+                    # Rate limited: back off (outside the semaphore) with jitter, at least Retry-After
+                    await asyncio.sleep(backoff_delay(attempt, getattr(e, "retry_after", None)))
+                except Exception as e:
+                    logger.error(f"Unexpected error sending reminder to user {user_id}: {e}")
+                    return "failed"
+            return "failed"
+
+        results = await asyncio.gather(
+            *(_send_one(user_id, polls_for_user) for user_id, polls_for_user in user_to_polls.items()),
+            return_exceptions=True,
+        )
+        if dm_channels_changed:
+            await save_dm_channels(dm_channels)
 
-                first_poll = polls_for_user[0]
-                poll_channel = guild.get_channel(first_poll.channel_id)
-
-                close_time = guild_settings.get("poll_close_time", "09:00")
-                publish_time = guild_settings.get("poll_publish_time", "14:30")
-                timezone = guild_settings.get("timezone", "Europe/Helsinki")
-
-                # Calculate the correct deadline date using the same logic as poll closing
-                deadline_date = get_poll_closing_date(first_poll.poll_date, publish_time, close_time, timezone)
-                deadline_ts = get_discord_timestamp(deadline_date, close_time, timezone, style="F")
-
-                # Use the dedicated function for consistent formatting
-                if poll_channel:
-                    embed = create_reminder_embed(poll_channel.id, deadline_ts, timezone)
-                else:
-                    # If no poll channel, create a basic reminder
-                    embed = discord.Embed(
-                        title="📝 Attendance Poll Reminder",
-                        description=(
-                            "You still have not voted in the attendance poll for tomorrow's events. "
-                            "Please cast your vote before the deadline!"
-                        ),
-                        color=0xFFA500,
-                    )
-                    embed.add_field(name="⏰ Deadline", value=deadline_ts, inline=False)
-                    embed.set_footer(text="This is an automated reminder from CampPoll")
-
-                await user.send(embed=embed)
-                await asyncio.sleep(0.3)
-                sent += 1
-                for pm in polls_for_user:
-                    pm.reminded_users.append(user_id)
-            except discord.Forbidden:
-                failed += 1
-            except discord.HTTPException as e:
-                if getattr(e, "status", None) == 429:
-                    await asyncio.sleep(float(getattr(e, "retry_after", 2)) or 2)
-                failed += 1
-            except Exception as e:
-                logger.error(f"Unexpected error sending reminder to user {user_id}: {e}")
-                failed += 1
+        sent = sum(1 for r in results if r == "sent")
+        failed = sum(1 for r in results if r == "failed" or isinstance(r, BaseException))
 
-        for pm in active_polls:
-            await save_poll(pm.to_dict())
+        # Write out whatever the write-behind queue still holds before reporting
+        await flush_poll_writes()
 
-        return {"sent": sent, "failed": failed, "already_reminded": already, "total_members": len(members), "total_polls": len(active_polls)}
+        return {"sent": sent, "failed": failed, "already_reminded": already, "total_members": len(members_by_id), "total_polls": len(active_polls)}
     except Exception as e:
         logger.error(f"Error sending reminders for guild {guild.id}: {e}")
         return {"sent": 0, "failed": 0, "already_reminded": 0, "total_polls": 0}
@@ -6,7 +6,6 @@ Handles all scheduling logic for polls, reminders, and other timed tasks.
 import logging
 from datetime import datetime, timezone
 from typing import Dict, Optional, Any, List
-from zoneinfo import ZoneInfo
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -14,7 +13,7 @@ import discord
 
 from models import GuildSettings
 from storage import get_guild_settings, load_guild_settings
-from utils.time import is_valid_timezone, parse_time
+from utils.time import get_zone, is_valid_timezone, parse_time
 from services.poll_manager import (
     publish_attendance_poll, send_reminders,
     close_all_active_polls, publish_feedback_polls
@@ -122,6 +121,7 @@ class SchedulerService:
                 parsed_time = parse_time(default)
             times[key] = parsed_time
         
+        zone = get_zone(timezone)
         job_configs = []
         
         # Poll publish job
@@ -131,7 +131,7 @@ class SchedulerService:
             'trigger': CronTrigger(
                 hour=times["poll_publish_time"][0],
                 minute=times["poll_publish_time"][1],
-                timezone=ZoneInfo(timezone)
+                timezone=zone
             ),
             'id': f"poll_publish_{guild_id}",
             'name': f"Poll Publish - Guild {guild_id}",
@@ -148,7 +148,7 @@ class SchedulerService:
             'trigger': CronTrigger(
                 hour=times["reminder_time"][0],
                 minute=times["reminder_time"][1],
-                timezone=ZoneInfo(timezone)
+                timezone=zone
             ),
             'id': f"poll_reminder_{guild_id}",
             'name': f"Poll Reminder - Guild {guild_id}",
@@ -165,7 +165,7 @@ class SchedulerService:
             'trigger': CronTrigger(
                 hour=times["poll_close_time"][0],
                 minute=times["poll_close_time"][1],
-                timezone=ZoneInfo(timezone)
+                timezone=zone
             ),
             'id': f"poll_close_{guild_id}",
             'name': f"Poll Close - Guild {guild_id}",
@@ -182,7 +182,7 @@ class SchedulerService:
             'trigger': CronTrigger(
                 hour=times["feedback_publish_time"][0],
                 minute=times["feedback_publish_time"][1],
-                timezone=ZoneInfo(timezone)
+                timezone=zone
             ),
             'id': f"feedback_publish_{guild_id}",
             'name': f"Feedback Publish - Guild {guild_id}",
@@ -7,11 +7,18 @@ import json
 import os
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
 from config import get_config
+from models import PollMeta
+
+try:  # optional fast JSON codec; stdlib json is used when it isn't installed
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +26,43 @@ logger = logging.getLogger(__name__)
 _file_locks: Dict[str, asyncio.Lock] = {}
 _locks_lock = asyncio.Lock()
 
+# Short-lived cache of per-guild settings. Settings change rarely but are read
+# by almost every command and scheduled job; writers invalidate the cache.
+GUILD_SETTINGS_TTL = 60.0
+_guild_settings_cache: Dict[str, Tuple[float, Optional[Dict]]] = {}
+_guild_settings_lock = asyncio.Lock()
+_guild_settings_generation = 0
+
+# Parsed polls plus indexes over them. The snapshot is reused until the file's
+# mtime changes; save_polls refreshes it after every in-process write.
+_polls_snapshot: Optional[Dict[str, Dict]] = None
+_polls_mtime_ns: Optional[int] = None
+_polls_lock = asyncio.Lock()
+# Serialises load-modify-write cycles so concurrent saves don't drop each other's updates
+_polls_write_lock = asyncio.Lock()
+_poll_ids_by_message: Dict[Tuple[int, str], str] = {}
+_active_poll_ids_by_guild: Dict[int, List[str]] = {}
+_active_poll_ids_by_date: Dict[Tuple[int, str], List[str]] = {}
+# PollMeta objects rehydrated from the snapshot, keyed by poll id. An entry is
+# reused only while the snapshot still holds the exact dict it was built from.
+_poll_metas: Dict[str, Tuple[Dict, PollMeta]] = {}
+
+# Write-behind queue of reminded users per poll id: queued ids are coalesced and
+# merged into the stored polls shortly afterwards, or earlier by flush_poll_writes().
+POLL_WRITE_DELAY = 0.5
+_pending_reminded_users: Dict[str, Set[int]] = {}
+_poll_flush_task: Optional[asyncio.Task] = None
+# True only while the delayed flush is still sleeping and may be cancelled safely
+_poll_flush_sleeping = False
+# Serialises flushes so a caller's flush also waits for one already writing
+_poll_flush_lock = asyncio.Lock()
+
+# Parsed events plus a by-date index, reused until events.json's mtime changes.
+_events_snapshot: Optional[List[Dict]] = None
+_events_mtime_ns: Optional[int] = None
+_events_lock = asyncio.Lock()
+_events_by_date: Dict[str, List[Dict]] = {}
+
 async def _get_file_lock(filename: str) -> asyncio.Lock:
     """Get or create a lock for a specific file."""
     async with _locks_lock:
@@ -26,6 +70,30 @@ async def _get_file_lock(filename: str) -> asyncio.Lock:
             _file_locks[filename] = asyncio.Lock()
         return _file_locks[filename]
 
+def _decode_json(raw: bytes) -> Any:
+    """Decode JSON bytes, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _encode_json(data: Any) -> bytes:
+    """Encode data as indented UTF-8 JSON, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+def _data_file(filename: str) -> Path:
+    """Return the path of a data file (filename without .json extension)."""
+    return Path(get_config().data_dir) / f"{filename}.json"
+
+async def _mtime_ns(filename: str) -> Optional[int]:
+    """Return a data file's modification time in ns, or None if it is missing."""
+    try:
+        stat = await asyncio.to_thread(os.stat, _data_file(filename))
+    except OSError:
+        return None
+    return stat.st_mtime_ns
+
 async def load(filename: str, default: Any = None) -> Any:
     """
     Load data from a JSON file.
@@ -37,8 +105,7 @@ async def load(filename: str, default: Any = None) -> Any:
     Returns:
         Loaded data or default value
     """
-    config = get_config()
-    file_path = Path(config.data_dir) / f"{filename}.json"
+    file_path = _data_file(filename)
     
     # Ensure data directory exists
     file_path.parent.mkdir(exist_ok=True)
@@ -50,15 +117,15 @@ async def load(filename: str, default: Any = None) -> Any:
             if not file_path.exists():
                 return default
             
-            # Read file asynchronously
-            content = await asyncio.to_thread(file_path.read_text, 'utf-8')
+            # Read and decode off the event loop; polls.json can grow large
+            content = await asyncio.to_thread(file_path.read_bytes)
             try:
-                return json.loads(content)
-            except json.JSONDecodeError as e:
-                # Backup corrupt file
+                return await asyncio.to_thread(_decode_json, content)
+            except ValueError as e:
+                # Backup corrupt file (JSONDecodeError and bad UTF-8 are ValueErrors)
                 backup_path = file_path.with_suffix('.json.bak')
                 try:
-                    await asyncio.to_thread(backup_path.write_text, content, 'utf-8')
+                    await asyncio.to_thread(backup_path.write_bytes, content)
                     backup_note = f" Backed up to {backup_path}."
                 except Exception:
                     backup_note = " Backup failed."
@@ -80,8 +147,7 @@ async def save(filename: str, data: Any) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    config = get_config()
-    file_path = Path(config.data_dir) / f"{filename}.json"
+    file_path = _data_file(filename)
     
     # Ensure data directory exists
     file_path.parent.mkdir(exist_ok=True)
@@ -90,14 +156,14 @@ async def save(filename: str, data: Any) -> bool:
     file_lock = await _get_file_lock(filename)
     async with file_lock:
         try:
-            # Convert data to JSON string
-            json_str = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+            # Convert data to JSON bytes
+            json_bytes = _encode_json(data)
 
             # Write atomically: write to a temp file then move in place
             tmp_path = file_path.with_suffix(".tmp")
 
             def _atomic_write():
-                tmp_path.write_text(json_str, encoding="utf-8")
+                tmp_path.write_bytes(json_bytes)
                 os.replace(tmp_path, file_path)
 
             await asyncio.to_thread(_atomic_write)
@@ -109,19 +175,70 @@ async def save(filename: str, data: Any) -> bool:
 
 # Event storage functions
 
+def _index_events(events: List[Dict], start: int = 0) -> None:
+    """Add events[start:] to the by-date index (a full rebuild when start is 0)."""
+    global _events_by_date
+    if start == 0:
+        _events_by_date = {}
+    for event in events[start:]:
+        _events_by_date.setdefault(event.get("date"), []).append(event)
+
+def invalidate_events_cache() -> None:
+    """Force the next event read to re-parse the events file."""
+    global _events_snapshot, _events_mtime_ns
+    _events_snapshot = None
+    _events_mtime_ns = None
+
+async def _get_events_snapshot() -> List[Dict]:
+    """Return the shared events snapshot, re-parsing only if the file changed."""
+    global _events_snapshot, _events_mtime_ns
+    mtime = await _mtime_ns("events")
+    if _events_snapshot is not None and mtime == _events_mtime_ns:
+        return _events_snapshot
+    async with _events_lock:
+        mtime = await _mtime_ns("events")
+        if _events_snapshot is None or mtime != _events_mtime_ns:
+            events = await load("events", [])
+            _index_events(events)
+            _events_snapshot = events
+            _events_mtime_ns = mtime
+    return _events_snapshot
+
 async def load_events() -> List[Dict]:
     """Load all events from storage."""
-    return await load("events", [])
+    # Event dicts are shared with the cache; the list itself is a fresh copy
+    return list(await _get_events_snapshot())
+
+async def _write_events(events: List[Dict], base: Optional[List[Dict]] = None) -> bool:
+    """
+    Persist events and make them the current snapshot.
+    
+    When events only appends to base and base is still the snapshot after the
+    write, just the appended events are indexed; otherwise the index is rebuilt.
+    """
+    global _events_snapshot, _events_mtime_ns
+    success = await save("events", events)
+    if success:
+        start = len(base) if base is not None and base is _events_snapshot else 0
+        _events_snapshot = list(events)
+        _events_mtime_ns = await _mtime_ns("events")
+        _index_events(_events_snapshot, start)
+    return success
 
 async def save_events(events: List[Dict]) -> bool:
     """Save events to storage."""
-    return await save("events", events)
+    return await _write_events(events)
 
 async def add_event(event_dict: Dict) -> bool:
     """Add a new event to storage."""
-    events = await load_events()
-    events.append(event_dict)
-    return await save_events(events)
+    return await add_events([event_dict])
+
+async def add_events(event_dicts: Iterable[Dict]) -> bool:
+    """Add several events to storage with a single load/save cycle."""
+    snapshot = await _get_events_snapshot()
+    events = list(snapshot)
+    events.extend(event_dicts)
+    return await _write_events(events, base=snapshot)
 
 async def update_event(event_id: str, updated_event: Dict) -> bool:
     """Update an existing event in storage."""
@@ -144,8 +261,8 @@ async def delete_event(event_id: str) -> bool:
 
 async def get_events_by_date(date: str, guild_id: Optional[int] = None) -> List[Dict]:
     """Get all events for a specific date, optionally filtered by guild_id."""
-    events = await load_events()
-    filtered = [event for event in events if event.get("date") == date]
+    await _get_events_snapshot()
+    filtered = list(_events_by_date.get(date, ()))
     if guild_id is not None:
         filtered = [event for event in filtered if event.get("guild_id") == guild_id]
     return filtered
@@ -162,27 +279,192 @@ async def get_events_by_type(event_type: str, date: Optional[str] = None, guild_
 
 # Poll storage functions
 
+def _index_polls(polls: Dict[str, Dict]) -> None:
+    """Rebuild the message-id, active-by-guild and active-by-date indexes from a polls dict."""
+    global _poll_ids_by_message, _active_poll_ids_by_guild, _active_poll_ids_by_date
+    _poll_ids_by_message = {}
+    _active_poll_ids_by_guild = {}
+    _active_poll_ids_by_date = {}
+    for poll_id, poll in polls.items():
+        _index_poll(poll_id, poll)
+
+def _index_poll(poll_id: str, poll: Dict) -> None:
+    """Add a single poll to the indexes."""
+    guild_id = poll.get("guild_id")
+    _poll_ids_by_message[(guild_id, str(poll.get("message_id")))] = poll_id
+    if poll.get("closed_at") is None:
+        for index, key in (
+            (_active_poll_ids_by_guild, guild_id),
+            (_active_poll_ids_by_date, (guild_id, poll.get("poll_date"))),
+        ):
+            active = index.setdefault(key, [])
+            if poll_id not in active:
+                active.append(poll_id)
+
+def _unindex_poll(poll_id: str, poll: Dict) -> None:
+    """Remove a single poll from the indexes."""
+    _poll_ids_by_message.pop((poll.get("guild_id"), str(poll.get("message_id"))), None)
+    guild_id = poll.get("guild_id")
+    for index, key in (
+        (_active_poll_ids_by_guild, guild_id),
+        (_active_poll_ids_by_date, (guild_id, poll.get("poll_date"))),
+    ):
+        active = index.get(key)
+        if active and poll_id in active:
+            active.remove(poll_id)
+
+def invalidate_polls_cache() -> None:
+    """Force the next poll read to re-parse the polls file."""
+    global _polls_snapshot, _polls_mtime_ns
+    _polls_snapshot = None
+    _polls_mtime_ns = None
+    _poll_metas.clear()
+
+def _set_polls_snapshot(polls: Dict[str, Dict], mtime: Optional[int]) -> None:
+    """Remember polls as the current snapshot (a shallow copy) for the given mtime."""
+    global _polls_snapshot, _polls_mtime_ns
+    _polls_snapshot = dict(polls)
+    _polls_mtime_ns = mtime
+
+async def _get_polls_snapshot() -> Dict[str, Dict]:
+    """Return the shared polls snapshot, re-parsing only if the file changed."""
+    mtime = await _mtime_ns("polls")
+    if _polls_snapshot is not None and mtime == _polls_mtime_ns:
+        return _polls_snapshot
+    async with _polls_lock:
+        mtime = await _mtime_ns("polls")
+        if _polls_snapshot is None or mtime != _polls_mtime_ns:
+            polls_list = await load("polls", [])
+            # Convert list to dict for easier access
+            polls = {poll["id"]: poll for poll in polls_list}
+            _index_polls(polls)
+            _set_polls_snapshot(polls, mtime)
+    return _polls_snapshot
+
 async def load_polls() -> Dict[str, Dict]:
     """Load all polls from storage. Returns dict with poll_id as key."""
-    polls_list = await load("polls", [])
-    # Convert list to dict for easier access
-    return {poll["id"]: poll for poll in polls_list}
+    # Poll dicts are shared with the cache; the outer dict is a fresh copy
+    return dict(await _get_polls_snapshot())
 
-async def save_polls(polls_dict: Dict[str, Dict]) -> bool:
-    """Save polls to storage."""
+async def _write_polls(polls_dict: Dict[str, Dict]) -> bool:
+    """Persist polls and make them the current snapshot."""
     # Convert dict back to list for storage
     polls_list = list(polls_dict.values())
-    return await save("polls", polls_list)
+    success = await save("polls", polls_list)
+    if success:
+        _set_polls_snapshot(polls_dict, await _mtime_ns("polls"))
+    return success
+
+async def _replace_polls(polls_dict: Dict[str, Dict]) -> bool:
+    """Write polls_dict as the whole polls file; the caller holds _polls_write_lock."""
+    success = await _write_polls(polls_dict)
+    if success:
+        _index_polls(polls_dict)
+        _poll_metas.clear()
+    return success
+
+async def save_polls(polls_dict: Dict[str, Dict]) -> bool:
+    """Save polls to storage."""
+    async with _polls_write_lock:
+        return await _replace_polls(polls_dict)
 
 async def save_poll(poll_dict: Dict) -> bool:
     """Save or update a single poll."""
+    return await save_poll_batch([poll_dict])
+
+async def _store_polls(poll_dicts: Iterable[Dict]) -> bool:
+    """Write several polls in one go; the caller holds _polls_write_lock."""
     polls = await load_polls()
-    polls[poll_dict["id"]] = poll_dict
-    return await save_polls(polls)
+    changed = []
+    for poll_dict in poll_dicts:
+        poll_id = poll_dict["id"]
+        changed.append((poll_id, polls.get(poll_id), poll_dict))
+        polls[poll_id] = poll_dict
+    if not changed:
+        return True
+    success = await _write_polls(polls)
+    if success:
+        # Only these polls changed, so patch the indexes instead of rebuilding them
+        for poll_id, previous, poll_dict in changed:
+            if previous is not None:
+                _unindex_poll(poll_id, previous)
+            _index_poll(poll_id, poll_dict)
+            _poll_metas.pop(poll_id, None)
+    return success
+
+async def save_poll_batch(poll_dicts: Iterable[Dict]) -> bool:
+    """Save or update several polls with a single write of the polls file."""
+    async with _polls_write_lock:
+        return await _store_polls(poll_dicts)
+
+async def _merge_reminded_users(pending: Dict[str, Set[int]]) -> bool:
+    """Add queued reminded users to the polls as currently stored."""
+    async with _polls_write_lock:
+        # Re-read under the lock so votes saved since the reminder run started survive
+        polls = await _get_polls_snapshot()
+        merged = []
+        for poll_id, user_ids in pending.items():
+            poll = polls.get(poll_id)
+            if poll is None:
+                continue  # deleted meanwhile
+            reminded = set(poll.get("reminded_users") or ()) | user_ids
+            merged.append({**poll, "reminded_users": list(reminded)})
+        return await _store_polls(merged)
+
+def queue_reminded_user(poll_id: str, user_id: int) -> None:
+    """
+    Queue a write-behind record that user_id was reminded about a poll.
+    
+    Only the reminded user ids are queued, never a whole poll, so the flush
+    can't overwrite votes stored in the meantime; queueing per DM is cheap.
+    """
+    global _poll_flush_task
+    _pending_reminded_users.setdefault(poll_id, set()).add(user_id)
+    if _poll_flush_task is None or _poll_flush_task.done():
+        _poll_flush_task = asyncio.create_task(_flush_poll_writes_later())
+
+async def _flush_poll_writes_later() -> None:
+    global _poll_flush_sleeping
+    while True:
+        _poll_flush_sleeping = True
+        try:
+            await asyncio.sleep(POLL_WRITE_DELAY)
+        finally:
+            _poll_flush_sleeping = False
+        # Updates queued while this flush was writing have no timer of their own
+        if not await flush_poll_writes() or not _pending_reminded_users:
+            return
+
+def _requeue_reminded_users(pending: Dict[str, Set[int]]) -> None:
+    # Keep the ids for the next flush alongside any queued meanwhile
+    for poll_id, user_ids in pending.items():
+        _pending_reminded_users.setdefault(poll_id, set()).update(user_ids)
+
+async def flush_poll_writes() -> bool:
+    """Merge all queued reminded users now in a single write. Returns True if nothing failed."""
+    global _poll_flush_task
+    if _poll_flush_sleeping and _poll_flush_task is not asyncio.current_task():
+        # The delayed flush hasn't taken anything from the queue yet, so it can go;
+        # one that is already writing is waited for on the lock below instead
+        _poll_flush_task.cancel()
+        _poll_flush_task = None
+    async with _poll_flush_lock:
+        if not _pending_reminded_users:
+            return True
+        pending = dict(_pending_reminded_users)
+        _pending_reminded_users.clear()
+        try:
+            success = await _merge_reminded_users(pending)
+        except BaseException:
+            _requeue_reminded_users(pending)
+            raise
+        if not success:
+            _requeue_reminded_users(pending)
+        return success
 
 async def get_poll(poll_id: str) -> Optional[Dict]:
     """Get a specific poll by ID."""
-    polls = await load_polls()
+    polls = await _get_polls_snapshot()
     return polls.get(poll_id)
 
 async def get_active_polls() -> List[Dict]:
@@ -195,13 +477,77 @@ async def get_polls_by_guild(guild_id: int) -> List[Dict]:
     polls = await load_polls()
     return [poll for poll in polls.values() if poll.get("guild_id") == guild_id]
 
+async def get_poll_by_message_id(guild_id: int, message_id: Any, active_only: bool = False) -> Optional[Dict]:
+    """Get a guild's poll by its Discord message ID using the in-memory index."""
+    polls = await _get_polls_snapshot()
+    poll_id = _poll_ids_by_message.get((guild_id, str(message_id)))
+    poll = polls.get(poll_id) if poll_id is not None else None
+    if poll is None or (active_only and poll.get("closed_at") is not None):
+        return None
+    return poll
+
+async def get_active_polls_by_guild(guild_id: int) -> List[Dict]:
+    """Get active (non-closed) polls for a guild using the in-memory index."""
+    polls = await _get_polls_snapshot()
+    return [
+        polls[poll_id]
+        for poll_id in _active_poll_ids_by_guild.get(guild_id, ())
+        if poll_id in polls
+    ]
+
+async def get_active_polls_by_date(guild_id: int, poll_date: str) -> List[Dict]:
+    """Get a guild's active polls for one poll date using the in-memory index."""
+    polls = await _get_polls_snapshot()
+    return [
+        polls[poll_id]
+        for poll_id in _active_poll_ids_by_date.get((guild_id, poll_date), ())
+        if poll_id in polls
+    ]
+
+async def has_active_attendance_poll(guild_id: int, poll_date: str) -> bool:
+    """Check whether a guild already has an open attendance poll for a date."""
+    return any(not poll.get("is_feedback", False) for poll in await get_active_polls_by_date(guild_id, poll_date))
+
+async def get_active_feedback_event_ids(guild_id: int, poll_date: str) -> Set[str]:
+    """Get the event ids that already have an open feedback poll for a guild and date."""
+    return {
+        option["event_id"]
+        for poll in await get_active_polls_by_date(guild_id, poll_date)
+        if poll.get("is_feedback", False)
+        for option in poll.get("options") or ()
+        if option.get("event_id")
+    }
+
+async def get_active_poll_metas(guild_id: int) -> List[PollMeta]:
+    """
+    Get a guild's active polls as PollMeta objects.
+    
+    Objects are rehydrated once per stored revision of a poll and reused on
+    later scheduler ticks. Callers that mutate one must either save it, which
+    swaps in a fresh object on the next call, or discard_poll_meta() it when
+    the change is abandoned, so the unsaved state isn't handed out again.
+    """
+    metas = []
+    for poll in await get_active_polls_by_guild(guild_id):
+        cached = _poll_metas.get(poll["id"])
+        if cached is None or cached[0] is not poll:
+            cached = (poll, PollMeta.from_dict(poll))
+            _poll_metas[poll["id"]] = cached
+        metas.append(cached[1])
+    return metas
+
+def discard_poll_meta(poll_id: str) -> None:
+    """Drop a cached PollMeta so the next get_active_poll_metas rebuilds it from storage."""
+    _poll_metas.pop(poll_id, None)
+
 async def delete_poll(poll_id: str) -> bool:
     """Delete a poll from storage."""
-    polls = await load_polls()
-    if poll_id in polls:
-        del polls[poll_id]
-        return await save_polls(polls)
-    return False
+    async with _polls_write_lock:
+        polls = await load_polls()
+        if poll_id in polls:
+            del polls[poll_id]
+            return await _replace_polls(polls)
+        return False
 
 # Guild settings storage functions
 
@@ -215,12 +561,44 @@ async def save_guild_settings(settings_dict: Dict[str, Dict]) -> bool:
     """Save guild settings to storage."""
     # Convert dict back to list for storage
     settings_list = list(settings_dict.values())
-    return await save("guild_settings", settings_list)
+    success = await save("guild_settings", settings_list)
+    invalidate_guild_settings_cache()
+    return success
+
+def invalidate_guild_settings_cache(guild_id: Optional[int] = None) -> None:
+    """Drop cached settings for one guild, or for all guilds when guild_id is None."""
+    global _guild_settings_generation
+    _guild_settings_generation += 1
+    if guild_id is None:
+        _guild_settings_cache.clear()
+    else:
+        _guild_settings_cache.pop(str(guild_id), None)
+
+def _cached_guild_settings(key: str) -> Tuple[bool, Optional[Dict]]:
+    """Return (hit, settings) for a cache key, honouring the TTL."""
+    entry = _guild_settings_cache.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+        return False, None
+    settings = entry[1]
+    # Hand out a copy so callers can mutate it before saving
+    return True, dict(settings) if settings is not None else None
 
 async def get_guild_settings(guild_id: int) -> Optional[Dict]:
-    """Get settings for a specific guild."""
-    settings = await load_guild_settings()
-    return settings.get(str(guild_id))
+    """Get settings for a specific guild (cached for GUILD_SETTINGS_TTL seconds)."""
+    key = str(guild_id)
+    hit, settings = _cached_guild_settings(key)
+    if hit:
+        return settings
+    async with _guild_settings_lock:
+        hit, settings = _cached_guild_settings(key)
+        if hit:
+            return settings
+        generation = _guild_settings_generation
+        settings = (await load_guild_settings()).get(key)
+        # Skip caching if a writer invalidated while we were reading
+        if generation == _guild_settings_generation:
+            _guild_settings_cache[key] = (time.monotonic() + GUILD_SETTINGS_TTL, settings)
+    return dict(settings) if settings is not None else None
 
 async def save_guild_setting(guild_setting: Dict) -> bool:
     """Save or update guild settings."""
@@ -229,12 +607,21 @@ async def save_guild_setting(guild_setting: Dict) -> bool:
     settings[guild_id] = guild_setting
     return await save_guild_settings(settings)
 
+# DM channel storage functions
+
+async def load_dm_channels() -> Dict[str, int]:
+    """Load the user_id -> DM channel id map. Keys are user ids as strings."""
+    return await load("dm_channels", {})
+
+async def save_dm_channels(channels: Dict[str, int]) -> bool:
+    """Save the user_id -> DM channel id map."""
+    return await save("dm_channels", channels)
+
 # Utility functions
 
 async def get_file_size(filename: str) -> int:
     """Get the size of a data file in bytes."""
-    config = get_config()
-    file_path = Path(config.data_dir) / f"{filename}.json"
+    file_path = _data_file(filename)
     
     try:
         return file_path.stat().st_size if file_path.exists() else 0
@@ -2,9 +2,10 @@
 
 """Unit tests for services.csv_service functions."""
 
+import csv
+import gzip
 import pytest
-import pandas as pd
-from io import BytesIO
+from io import BytesIO, TextIOWrapper
 from datetime import datetime
 
 from models import PollMeta, PollOption, EventType
@@ -12,9 +13,18 @@ from services.csv_service import (
     create_attendance_csv,
     create_summary_csv,
     export_user_votes,
+    gzip_csv,
+    prepare_csv_upload,
 )
 
 
+def read_csv_rows(buffer: BytesIO) -> tuple[list[str], list[dict]]:
+    """Parse a CSV buffer into (header, rows as dicts)."""
+    reader = csv.DictReader(TextIOWrapper(buffer, encoding="utf-8", newline=""))
+    rows = list(reader)
+    return reader.fieldnames, rows
+
+
 @pytest.fixture()
 def sample_poll_meta():
     """Return a PollMeta with two options and user votes."""
@@ -39,12 +49,36 @@ async def test_create_attendance_csv(sample_poll_meta):
     csv_bytes: BytesIO | None = await create_attendance_csv(sample_poll_meta, guild_members)
     assert csv_bytes is not None
 
-    # Read back into DataFrame to verify contents
-    df = pd.read_csv(csv_bytes)
-    assert set(df.columns) == {"user_id", "username", "choice"}
+    # Read back to verify contents
+    header, rows = read_csv_rows(csv_bytes)
+    assert set(header) == {"user_id", "username", "choice"}
     # After de-duplication we expect one row per voter
-    assert len(df) == 3
-    assert {"Alice", "Bob", "Carol"}.issubset(set(df["username"]))
+    assert len(rows) == 3
+    assert {"Alice", "Bob", "Carol"}.issubset({row["username"] for row in rows})
+
+
+@pytest.mark.asyncio
+async def test_gzip_csv_round_trip(sample_poll_meta):
+    csv_bytes = await create_attendance_csv(sample_poll_meta)
+    raw = csv_bytes.getvalue()
+
+    compressed = await gzip_csv(csv_bytes)
+    assert compressed.tell() == 0
+    assert gzip.decompress(compressed.read()) == raw
+
+
+@pytest.mark.asyncio
+async def test_prepare_csv_upload_gzips_only_large_exports(sample_poll_meta):
+    csv_bytes = await create_attendance_csv(sample_poll_meta)
+    raw = csv_bytes.getvalue()
+
+    buffer, filename = await prepare_csv_upload(csv_bytes, "attendance.csv")
+    assert buffer is csv_bytes
+    assert filename == "attendance.csv"
+
+    buffer, filename = await prepare_csv_upload(csv_bytes, "attendance.csv", threshold=len(raw) - 1)
+    assert filename == "attendance.csv.gz"
+    assert gzip.decompress(buffer.read()) == raw
 
 
 @pytest.mark.asyncio
@@ -52,11 +86,22 @@ async def test_export_user_votes(sample_poll_meta):
     csv_bytes = await export_user_votes(sample_poll_meta)
     assert csv_bytes is not None
 
-    df = pd.read_csv(csv_bytes)
+    _, rows = read_csv_rows(csv_bytes)
     # There should be one row per (user, vote)
     expected_rows = len(sample_poll_meta.options[0].votes) + len(sample_poll_meta.options[1].votes)
-    assert len(df) == expected_rows
-    assert set(df["Poll ID"].unique()) == {sample_poll_meta.id}
+    assert len(rows) == expected_rows
+    assert {row["Poll ID"] for row in rows} == {sample_poll_meta.id}
+
+
+@pytest.mark.asyncio
+async def test_export_user_votes_without_votes_is_header_only(sample_poll_meta):
+    for option in sample_poll_meta.options:
+        option.set_votes([])
+
+    csv_bytes = await export_user_votes(sample_poll_meta)
+    header, rows = read_csv_rows(csv_bytes)
+    assert header[0] == "User ID"
+    assert rows == []
 
 
 @pytest.mark.asyncio
@@ -76,8 +121,15 @@ async def test_create_summary_csv(sample_poll_meta):
     csv_bytes = await create_summary_csv([sample_poll_meta, empty_poll], date_range="2024-12-25 – 2024-12-26")
     assert csv_bytes is not None
 
-    df = pd.read_csv(csv_bytes)
+    _, rows = read_csv_rows(csv_bytes)
     # There should be at least one header row and some data rows
-    assert not df.empty
+    assert rows
     # Ensure the summary header row exists
-    assert (df["Status"] == "HEADER").any() 
\ No newline at end of file
+    assert any(row["Status"] == "HEADER" for row in rows)
+    # Options are listed by votes with their share of the poll's voters
+    option_rows = [row for row in rows if row["Event Type"]]
+    assert [(row["Event Title"], row["Votes"], row["Percentage"]) for row in option_rows] == [
+        ("Lecture: Intro", "2", "66.7%"),
+        ("Contest: Challenge", "2", "66.7%"),
+        ("Lecture: Empty", "0", "0.0%"),
+    ] 
\ No newline at end of file
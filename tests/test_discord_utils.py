@@ -11,6 +11,7 @@ import discord
 from utils.discord import (
     EmbedBuilder, EmbedColors, create_success_embed, create_error_embed,
     create_poll_results_embed, create_event_embed, format_user_list,
+    create_poll_closed_embed, create_user_votes_export_embed, create_reminder_embed,
     check_bot_permissions, get_missing_permissions
 )
 from models import PollMeta, PollOption, Event, EventType
@@ -68,6 +69,37 @@ class TestEmbedCreationFunctions:
         assert "❌" in embed.title
         assert "Error Occurred" in embed.title
         assert embed.color.value == EmbedColors.ERROR
+    
+    def test_poll_command_embeds(self):
+        poll_meta = PollMeta(
+            id="poll123", guild_id=1, channel_id=2, message_id=3, poll_date="2024-12-25",
+            options=[
+                PollOption("e1", "Lecture", EventType.LECTURE, votes=[1, 2]),
+                PollOption("e2", "Contest", EventType.CONTEST, votes=[2]),
+            ],
+        )
+        
+        closed = create_poll_closed_embed(poll_meta)
+        assert closed.title == "✅ Poll Closed"
+        assert closed.color.value == EmbedColors.SUCCESS
+        assert closed.fields[0].value == "**2** total votes\n**2** options"
+        assert closed.footer.text == "Poll ID: poll123"
+        
+        user_votes = create_user_votes_export_embed(poll_meta)
+        assert user_votes.fields[0].value == "**2** users voted"
+        assert [f.inline for f in user_votes.fields] == [True, True]
+    
+    def test_reminder_embed_with_and_without_channel(self):
+        embed = create_reminder_embed(42, "<t:1:F>", "UTC")
+        assert embed.title == "📝 Attendance Poll Reminder"
+        assert embed.color.value == EmbedColors.WARNING
+        assert [(f.name, f.value) for f in embed.fields] == [
+            ("🗳️ Poll Channel", "<#42>"), ("⏰ Deadline", "<t:1:F>"),
+        ]
+        assert embed.footer.text == "This is an automated reminder from CampPoll"
+        
+        no_channel = create_reminder_embed(None, "<t:1:F>", "UTC")
+        assert [f.name for f in no_channel.fields] == ["⏰ Deadline"]
 
 
 class TestPollResultsEmbed:
@@ -61,6 +61,21 @@ class TestEventManagement:
         assert restored.title == original.title
         assert restored.date == original.date
         assert restored.event_type == original.event_type
+        assert restored.to_dict() == event_dict
+    
+    def test_poll_meta_serialization_reuses_and_refreshes_timestamps(self):
+        """published_at round-trips verbatim and follows reassignment."""
+        data = PollMeta(
+            id="p1", guild_id=1, channel_id=2, message_id=3, poll_date="2024-12-25",
+            published_at=datetime(2024, 12, 24, 14, 30)
+        ).to_dict()
+        assert data["published_at"] == "2024-12-24T14:30:00"
+        
+        restored = PollMeta.from_dict(data)
+        assert restored.to_dict() == data
+        
+        restored.published_at = datetime(2024, 12, 24, 15, 0)
+        assert restored.to_dict()["published_at"] == "2024-12-24T15:00:00"
 
 class TestPollLogic:
     """Test poll management logic."""
@@ -106,6 +121,59 @@ class TestPollLogic:
         assert option.remove_vote(123) is False  # Already removed
         assert option.vote_count == 1
     
+    def test_poll_option_set_votes_keeps_membership_in_sync(self):
+        """Replacing votes wholesale keeps has_vote/add_vote consistent."""
+        option = PollOption("test-event", "Test Event", EventType.LECTURE, votes=[1, 2])
+        assert option.has_vote(1)
+        
+        voters = [3]
+        option.set_votes(voters)
+        assert option.votes is voters
+        assert not option.has_vote(1)
+        assert option.add_vote(3) is False
+        assert option.add_vote(1) is True
+        assert option.votes == [3, 1]
+    
+    def test_vote_by_answer_id(self):
+        """Answer-id votes hit the right option, including ids assigned after construction."""
+        option1 = PollOption("event1", "Lecture 1", EventType.LECTURE, answer_id="1")
+        option2 = PollOption("event2", "Contest 1", EventType.CONTEST)
+        poll = PollMeta(
+            id="test-poll", guild_id=1, channel_id=2, message_id=3,
+            poll_date="2024-12-25", options=[option1, option2]
+        )
+        option2.answer_id = "2"
+        
+        assert poll.record_vote_by_answer_id(123, "1") is True
+        assert poll.record_vote_by_answer_id(123, "2") is True  # attendance allows several
+        assert poll.record_vote_by_answer_id(123, "3") is False
+        assert poll.get_option_by_answer_id("2") is option2
+        assert poll.get_option_by_answer_id("3") is None
+        assert option1.votes == [123] and option2.votes == [123]
+        
+        assert poll.remove_vote_by_answer_id(123, "2") is True
+        assert poll.remove_vote_by_answer_id(123, "2") is False
+        assert option2.votes == []
+    
+    def test_total_votes_tracks_option_changes(self):
+        """The cached voter set follows votes made through any option method."""
+        option1 = PollOption("event1", "Lecture 1", EventType.LECTURE, votes=[1, 2])
+        option2 = PollOption("event2", "Contest 1", EventType.CONTEST, votes=[2])
+        poll = PollMeta(
+            id="test-poll", guild_id=1, channel_id=2, message_id=3,
+            poll_date="2024-12-25", options=[option1, option2]
+        )
+        assert poll.total_votes == 2
+        
+        option2.add_vote(3)
+        assert poll.total_votes == 3
+        option1.set_votes([])
+        assert poll.total_votes == 2
+        assert poll.get_non_voters([1, 2, 3, 4]) == [1, 4]
+        
+        poll.options = [option1]
+        assert poll.total_votes == 0
+    
     def test_poll_meta_voting(self):
         """Test poll metadata vote management."""
         poll = PollMeta(
@@ -8,10 +8,12 @@ import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch, MagicMock
 
+import discord
+
 from models import Event, EventType, PollMeta, PollOption, GuildSettings
 from utils.time import get_poll_closing_date
 from services.polls.attendance import publish_attendance_poll, chunk_events  
-from services.polls.feedback import publish_feedback_polls, create_feedback_poll
+from services.polls.feedback import publish_feedback_polls, create_feedback_poll, _recent_feedback_polls
 from utils.time import tz_today, tz_tomorrow
 
 
@@ -46,7 +48,7 @@ class TestAttendancePollLogic:
     
     @pytest.mark.asyncio
     @patch('services.polls.attendance.get_events_by_date')
-    @patch('services.polls.attendance.save_poll')
+    @patch('services.polls.attendance.save_poll_batch')
     async def test_publish_attendance_poll_for_tomorrow(self, mock_save, mock_get_events):
         """Test that attendance polls are created for tomorrow's events."""
         # Mock tomorrow's events as dictionaries (as returned by storage)
@@ -78,6 +80,10 @@ class TestAttendancePollLogic:
         
         mock_message = MagicMock()
         mock_message.id = 98765
+        mock_message.poll.answers = [
+            MagicMock(text="Lecture: Tomorrow Lecture", id=1),
+            MagicMock(text="Contest: Tomorrow Contest", id=2),
+        ]
         mock_channel.send = AsyncMock(return_value=mock_message)
         
         mock_bot = MagicMock()
@@ -97,6 +103,53 @@ class TestAttendancePollLogic:
         assert len(polls) == 1
         assert polls[0].poll_date == tz_tomorrow("Europe/Helsinki")
         assert len(polls[0].options) == 2  # Two pollable events
+        assert [opt.answer_id for opt in polls[0].options] == ["1", "2"]
+        mock_save.assert_awaited_once()
+        assert [p["id"] for p in mock_save.call_args[0][0]] == ["98765"]
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.attendance.get_events_by_date')
+    @patch('services.polls.attendance.save_poll_batch')
+    async def test_multi_chunk_polls_are_posted_in_order(self, mock_save, mock_get_events):
+        """Chunked polls reach the channel as 1/N, 2/N, ... even if a send is slow."""
+        mock_get_events.return_value = [
+            {
+                'id': f'event{i}',
+                'title': f'Lecture {i}',
+                'date': tz_tomorrow(),
+                'event_type': 'lecture',
+                'created_at': '2024-01-01T00:00:00+00:00',
+                'feedback_only': False
+            }
+            for i in range(12)
+        ]
+        
+        started = []
+        posted = []
+        
+        async def send(poll):
+            started.append(poll)
+            # The first chunk is the slowest to post
+            await asyncio.sleep(0.02 if len(started) == 1 else 0)
+            posted.append(str(poll.question))
+            message = MagicMock()
+            message.id = len(posted)
+            message.poll.answers = []
+            return message
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        mock_channel = MagicMock()
+        mock_channel.send = AsyncMock(side_effect=send)
+        mock_guild.get_channel.return_value = mock_channel
+        
+        guild_settings = {"timezone": "Europe/Helsinki", "poll_channel_id": 67890}
+        polls = await publish_attendance_poll(MagicMock(), mock_guild, guild_settings)
+        
+        assert len(polls) == 2
+        assert [q[-10:] for q in posted] == ["(Poll 1/2)", "(Poll 2/2)"]
+        # Each poll is recorded right after its own send
+        assert [[p["id"] for p in call.args[0]] for call in mock_save.call_args_list] == [["1"], ["2"]]
     
     @pytest.mark.asyncio
     @patch('services.polls.attendance.get_events_by_date')
@@ -137,10 +190,14 @@ class TestAttendancePollLogic:
 class TestFeedbackPollLogic:
     """Test feedback poll creation and logic."""
     
+    def setup_method(self):
+        _recent_feedback_polls.clear()
+    
     @pytest.mark.asyncio
+    @patch('services.polls.feedback.save_poll_batch')
     @patch('services.polls.feedback.get_events_by_date')
     @patch('services.polls.feedback.create_feedback_poll')
-    async def test_publish_feedback_polls_for_today(self, mock_create_feedback, mock_get_events):
+    async def test_publish_feedback_polls_for_today(self, mock_create_feedback, mock_get_events, mock_save_batch):
         """Test that feedback polls are created for today's events."""
         # Mock today's events as dictionaries (as returned by storage)
         today_events = [
@@ -188,6 +245,9 @@ class TestFeedbackPollLogic:
         # Verify feedback polls were created
         assert len(polls) == 2  # Two events = two feedback polls
         assert mock_create_feedback.call_count == 2
+        assert all(call.kwargs == {"save": False} for call in mock_create_feedback.call_args_list)
+        mock_save_batch.assert_awaited_once()
+        assert len(mock_save_batch.call_args[0][0]) == 2
     
     @pytest.mark.asyncio
     @patch('services.polls.feedback.get_events_by_date')
@@ -243,6 +303,41 @@ class TestFeedbackPollLogic:
         option_texts = [opt.title for opt in poll.options]
         assert "😻 It was super useful!" in option_texts
         assert "🆗 I knew smth before, but still enjoyed it!" in option_texts
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.feedback.save_poll')
+    async def test_create_feedback_poll_skips_recent_duplicate(self, mock_save):
+        """A second create for the same event and date doesn't post another poll."""
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        mock_channel = MagicMock()
+        mock_channel.id = 67890
+        mock_guild.get_channel.return_value = mock_channel
+        mock_message = MagicMock()
+        mock_message.id = 98765
+        mock_channel.send = AsyncMock(return_value=mock_message)
+        mock_channel.fetch_message = AsyncMock(return_value=mock_message)
+        
+        guild_settings = {"poll_channel_id": 67890}
+        event_option = PollOption(
+            event_id="test-event",
+            title="Lecture: Python Basics",
+            event_type=EventType.LECTURE
+        )
+        
+        first = await create_feedback_poll(mock_guild, event_option, guild_settings, "2024-12-25")
+        second = await create_feedback_poll(mock_guild, event_option, guild_settings, "2024-12-25")
+        
+        assert first is not None
+        assert second is None
+        mock_channel.send.assert_awaited_once()
+        mock_channel.fetch_message.assert_awaited_once_with(98765)
+        
+        # Once the earlier poll is gone, the event can get a poll again
+        mock_channel.fetch_message.side_effect = discord.NotFound(MagicMock(status=404), "gone")
+        third = await create_feedback_poll(mock_guild, event_option, guild_settings, "2024-12-25")
+        assert third is not None
+        assert mock_channel.send.await_count == 2
 
 
 class TestEventFiltering:
@@ -282,9 +377,10 @@ class TestPollClosingLogic:
     """Test poll closing logic and timing."""
     
     @pytest.mark.asyncio
-    @patch('services.polls.closing.load_polls')
+    @patch('services.polls.closing.save_poll_batch')
+    @patch('services.polls.closing.get_active_poll_metas')
     @patch('services.polls.closing.close_poll')
-    async def test_close_only_todays_attendance_polls(self, mock_close_poll, mock_load_polls):
+    async def test_close_only_todays_attendance_polls(self, mock_close_poll, mock_load_polls, mock_save_batch):
         """Test that only today's attendance polls are closed based on smart timing logic."""
         from datetime import datetime, timezone
         
@@ -331,7 +427,7 @@ class TestPollClosingLogic:
             }
         }
         
-        mock_load_polls.return_value = mock_polls
+        mock_load_polls.return_value = [PollMeta.from_dict(p) for p in mock_polls.values()]
         mock_close_poll.return_value = True
         
         mock_guild = MagicMock()
@@ -356,9 +452,10 @@ class TestPollClosingLogic:
         # С новой логикой feedback опросы не закрываются в тот же день
 
     @pytest.mark.asyncio
-    @patch('services.polls.closing.load_polls')
+    @patch('services.polls.closing.save_poll_batch')
+    @patch('services.polls.closing.get_active_poll_metas')
     @patch('services.polls.closing.close_poll')
-    async def test_smart_closing_same_day(self, mock_close_poll, mock_load_polls):
+    async def test_smart_closing_same_day(self, mock_close_poll, mock_load_polls, mock_save_batch):
         """Test smart closing logic when close_time >= publish_time (same day closing)."""
         from datetime import datetime, timezone
         
@@ -379,7 +476,7 @@ class TestPollClosingLogic:
             }
         }
         
-        mock_load_polls.return_value = mock_polls
+        mock_load_polls.return_value = [PollMeta.from_dict(p) for p in mock_polls.values()]
         mock_close_poll.return_value = True
         
         mock_guild = MagicMock()
@@ -404,7 +501,318 @@ class TestPollClosingLogic:
         # Verify which poll was closed
         closed_poll_ids = [call[0][2].id for call in mock_close_poll.call_args_list]
         assert "poll1" in closed_poll_ids  # Today's attendance poll closes today
+        assert mock_close_poll.call_args.kwargs == {"save": False}
+        
+        # Closed polls are stored together with one direct write
+        mock_save_batch.assert_awaited_once()
+        assert [p["id"] for p in mock_save_batch.call_args[0][0]] == ["poll1"]
 
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.closing.discard_poll_meta')
+    @patch('services.polls.closing.save_poll_batch')
+    @patch('services.polls.closing.get_active_poll_metas')
+    @patch('services.polls.closing.close_poll')
+    async def test_failed_close_discards_cached_poll(
+        self, mock_close_poll, mock_load_polls, mock_save_batch, mock_discard
+    ):
+        """A poll that failed to close isn't saved and its cached object is dropped."""
+        mock_load_polls.return_value = [PollMeta(
+            id="poll1", guild_id=12345, channel_id=67890, message_id=11111, poll_date=tz_today("Europe/Helsinki")
+        )]
+        mock_close_poll.return_value = False
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        guild_settings = {"timezone": "Europe/Helsinki", "poll_publish_time": "15:00", "poll_close_time": "18:00"}
+        
+        from services.polls.closing import close_all_active_polls
+        assert await close_all_active_polls(MagicMock(), mock_guild, guild_settings) == 0
+        mock_save_batch.assert_not_awaited()
+        mock_discard.assert_called_once_with("poll1")
+
+class TestClosePoll:
+    """Test closing a single poll."""
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.closing.save_poll')
+    async def test_close_poll_records_final_voters(self, mock_save):
+        """Final voters come from Discord and results go to the organiser channel."""
+        from services.polls.closing import close_poll
+        
+        def make_answer(text, voter_ids):
+            answer = MagicMock()
+            answer.text = text
+            answer.vote_count = len(voter_ids)
+            
+            async def voters():
+                for uid in voter_ids:
+                    yield MagicMock(id=uid)
+            
+            answer.voters = voters
+            return answer
+        
+        ended_poll = MagicMock()
+        ended_poll.answers = [make_answer("Lecture: A", [1]), make_answer("Contest: B", [1, 2])]
+        ended_poll.total_votes = 2
+        
+        poll_channel = MagicMock()
+        poll_channel.get_partial_message.return_value.end_poll = AsyncMock(
+            return_value=MagicMock(poll=ended_poll)
+        )
+        organiser_channel = MagicMock()
+        organiser_channel.send = AsyncMock()
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        mock_guild.get_channel.side_effect = {67890: poll_channel, 999: organiser_channel}.get
+        mock_save.return_value = True
+        
+        poll_meta = PollMeta(
+            id="poll1", guild_id=12345, channel_id=67890, message_id=11111, poll_date="2024-12-25",
+            options=[
+                PollOption("e1", "Lecture: A", EventType.LECTURE),
+                PollOption("e2", "Contest: B", EventType.CONTEST),
+            ],
+        )
+        
+        assert await close_poll(MagicMock(), mock_guild, poll_meta, {"organiser_channel_id": 999}) is True
+        poll_channel.get_partial_message.assert_called_once_with(11111)
+        poll_channel.fetch_message.assert_not_called()
+        assert poll_meta.is_closed
+        assert [option.votes for option in poll_meta.options] == [[1], [1, 2]]
+        assert organiser_channel.send.await_count == 2  # results embed + CSV
+        mock_save.assert_awaited_once_with(poll_meta.to_dict())
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.closing.save_poll')
+    async def test_close_poll_without_votes_skips_voter_pagination(self, mock_save):
+        """A poll nobody voted in is closed with a single note and no voter lookups."""
+        from services.polls.closing import close_poll
+        
+        answer = MagicMock()
+        answer.text = "Lecture: A"
+        answer.vote_count = 0
+        answer.voters = MagicMock(side_effect=AssertionError("voters() should not be called"))
+        ended_poll = MagicMock()
+        ended_poll.answers = [answer]
+        ended_poll.total_votes = 0
+        ended_poll.is_finalized.return_value = True
+        
+        poll_channel = MagicMock()
+        poll_channel.get_partial_message.return_value.end_poll = AsyncMock(
+            return_value=MagicMock(poll=ended_poll)
+        )
+        organiser_channel = MagicMock()
+        organiser_channel.send = AsyncMock()
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        mock_guild.get_channel.side_effect = {67890: poll_channel, 999: organiser_channel}.get
+        mock_save.return_value = True
+        
+        poll_meta = PollMeta(
+            id="poll1", guild_id=12345, channel_id=67890, message_id=11111, poll_date="2024-12-25",
+            options=[PollOption("e1", "Lecture: A", EventType.LECTURE, votes=[5])],
+        )
+        
+        assert await close_poll(MagicMock(), mock_guild, poll_meta, {"organiser_channel_id": 999}) is True
+        assert poll_meta.options[0].votes == []
+        organiser_channel.send.assert_awaited_once()
+        assert "file" not in organiser_channel.send.call_args.kwargs
+        embed = organiser_channel.send.call_args.kwargs["embed"]
+        assert embed.timestamp == poll_meta.closed_at
+        assert "<t:" not in embed.footer.text
+        mock_save.assert_awaited_once_with(poll_meta.to_dict())
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.closing.save_poll')
+    async def test_close_poll_fetches_voters_while_counts_are_provisional(self, mock_save):
+        """Zero counts on a poll Discord hasn't finalised yet still get the voter fetch."""
+        from services.polls.closing import close_poll
+        
+        answer = MagicMock()
+        answer.text = "Lecture: A"
+        answer.vote_count = 0
+        
+        async def voters():
+            yield MagicMock(id=7)
+        
+        answer.voters = voters
+        ended_poll = MagicMock()
+        ended_poll.answers = [answer]
+        ended_poll.total_votes = 0
+        ended_poll.is_finalized.return_value = False
+        
+        poll_channel = MagicMock()
+        poll_channel.get_partial_message.return_value.end_poll = AsyncMock(
+            return_value=MagicMock(poll=ended_poll)
+        )
+        organiser_channel = MagicMock()
+        organiser_channel.send = AsyncMock()
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        mock_guild.get_channel.side_effect = {67890: poll_channel, 999: organiser_channel}.get
+        
+        poll_meta = PollMeta(
+            id="poll1", guild_id=12345, channel_id=67890, message_id=11111, poll_date="2024-12-25",
+            options=[PollOption("e1", "Lecture: A", EventType.LECTURE)],
+        )
+        
+        assert await close_poll(MagicMock(), mock_guild, poll_meta, {"organiser_channel_id": 999}) is True
+        assert poll_meta.options[0].votes == [7]
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.closing.delete_poll')
+    async def test_close_poll_removes_record_whose_message_has_no_poll(self, mock_delete):
+        """end_poll rejects a message without a poll with a 400; the record is an orphan."""
+        from services.polls.closing import close_poll
+        
+        poll_channel = MagicMock()
+        poll_channel.get_partial_message.return_value.end_poll = AsyncMock(
+            side_effect=discord.HTTPException(MagicMock(status=400), {"code": 520006, "message": "not a poll"})
+        )
+        poll_channel.fetch_message = AsyncMock(return_value=MagicMock(poll=None))
+        mock_guild = MagicMock()
+        mock_guild.get_channel.return_value = poll_channel
+        
+        poll_meta = PollMeta(id="poll1", guild_id=12345, channel_id=67890, message_id=11111, poll_date="2024-12-25")
+        
+        assert await close_poll(MagicMock(), mock_guild, poll_meta, {"organiser_channel_id": 999}) is False
+        poll_channel.fetch_message.assert_awaited_once_with(11111)
+        mock_delete.assert_awaited_once_with("poll1")
+        assert not poll_meta.is_closed
+
+
+class TestReminderLogic:
+    """Test reminder targeting."""
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.reminders.save_dm_channels')
+    @patch('services.polls.reminders.load_dm_channels')
+    @patch('services.polls.reminders.delete_poll')
+    @patch('services.polls.reminders.flush_poll_writes')
+    @patch('services.polls.reminders.queue_reminded_user')
+    @patch('services.polls.reminders.get_active_poll_metas')
+    async def test_reminds_only_unreminded_non_voters(
+        self, mock_load_polls, mock_queue, mock_flush, mock_delete, mock_load_dms, mock_save_dms
+    ):
+        """Voters and already-reminded students are skipped; the rest get one DM."""
+        from services.polls.reminders import send_reminders
+        
+        mock_load_polls.return_value = [
+            PollMeta.from_dict({
+                "id": "poll1",
+                "guild_id": 12345,
+                "channel_id": 67890,
+                "message_id": 11111,
+                "poll_date": tz_tomorrow(),
+                "options": [
+                    {"event_id": "e1", "title": "Lecture: A", "event_type": "lecture", "votes": [1], "answer_id": "1"}
+                ],
+                "published_at": "2024-01-01T00:00:00+00:00",
+                "closed_at": None,
+                "reminded_users": [2],
+                "is_feedback": False
+            })
+        ]
+        mock_flush.return_value = True
+        
+        student_role = MagicMock()
+        student_role.name = "student"
+        student_role.id = 555
+        members = {}
+        for uid in (1, 2, 3):
+            member = MagicMock()
+            member.id = uid
+            member.bot = False
+            member.roles = [student_role]
+            member.dm_channel = None
+            member.create_dm = AsyncMock(return_value=MagicMock(id=1000 + uid, send=AsyncMock()))
+            members[uid] = member
+        mock_load_dms.return_value = {}
+        
+        channel = MagicMock()
+        channel.id = 67890
+        channel.fetch_message = AsyncMock(return_value=MagicMock(poll=MagicMock()))
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        mock_guild.roles = [student_role]
+        student_role.members = list(members.values())
+        mock_guild.get_channel.return_value = channel
+        mock_guild.get_member.side_effect = AssertionError("members come from the student role")
+        
+        guild_settings = {"timezone": "Europe/Helsinki", "student_role_name": "student"}
+        result = await send_reminders(MagicMock(), mock_guild, guild_settings)
+        
+        assert result["sent"] == 1
+        assert result["already_reminded"] == 1
+        members[3].create_dm.return_value.send.assert_awaited_once()
+        members[1].create_dm.assert_not_awaited()
+        members[2].create_dm.assert_not_awaited()
+        mock_save_dms.assert_awaited_once_with({"3": 1003})
+        mock_queue.assert_called_once_with("poll1", 3)
+        mock_flush.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    @patch('services.polls.reminders.save_dm_channels')
+    @patch('services.polls.reminders.load_dm_channels')
+    @patch('services.polls.reminders.flush_poll_writes')
+    @patch('services.polls.reminders.queue_reminded_user')
+    @patch('services.polls.reminders.get_active_poll_metas')
+    async def test_stale_dm_channel_is_replaced_and_retried(
+        self, mock_load_polls, mock_queue, mock_flush, mock_load_dms, mock_save_dms
+    ):
+        """A cached DM channel that 404s is dropped and the DM goes to a fresh one."""
+        from services.polls.reminders import send_reminders
+        
+        mock_load_polls.return_value = [PollMeta(
+            id="poll1", guild_id=12345, channel_id=67890, message_id=11111, poll_date=tz_tomorrow(),
+            options=[PollOption("e1", "Lecture: A", EventType.LECTURE)],
+        )]
+        mock_flush.return_value = True
+        mock_load_dms.return_value = {"3": 999}
+        
+        student_role = MagicMock()
+        student_role.name = "student"
+        member = MagicMock()
+        member.id = 3
+        member.bot = False
+        member.dm_channel = None
+        fresh_channel = MagicMock(id=1003, send=AsyncMock())
+        member.create_dm = AsyncMock(return_value=fresh_channel)
+        student_role.members = [member]
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        mock_guild.roles = [student_role]
+        mock_guild.get_channel.return_value = MagicMock(id=67890)
+        
+        mock_bot = MagicMock()
+        stale_channel = mock_bot.get_partial_messageable.return_value
+        stale_channel.send = AsyncMock(side_effect=discord.NotFound(MagicMock(status=404), "Unknown Channel"))
+        
+        result = await send_reminders(mock_bot, mock_guild, {"timezone": "Europe/Helsinki"})
+        
+        assert result["sent"] == 1
+        assert result["failed"] == 0
+        stale_channel.send.assert_awaited_once()
+        fresh_channel.send.assert_awaited_once()
+        mock_save_dms.assert_awaited_once_with({"3": 1003})
+
+    
+    @pytest.mark.parametrize("value, expected", [(None, 8), ("3", 3), ("0", 1), ("-2", 1), ("many", 8)])
+    def test_dm_concurrency_from_env(self, monkeypatch, value, expected):
+        """REMINDER_CONCURRENCY is parsed as an int and clamped to at least 1."""
+        from services.polls.reminders import _dm_concurrency
+        
+        if value is None:
+            monkeypatch.delenv("REMINDER_CONCURRENCY", raising=False)
+        else:
+            monkeypatch.setenv("REMINDER_CONCURRENCY", value)
+        assert _dm_concurrency() == expected
 
 class TestErrorHandling:
     """Test error handling in poll manager."""
@@ -424,6 +832,36 @@ class TestErrorHandling:
         polls = await publish_attendance_poll(mock_bot, mock_guild, guild_settings)
         assert len(polls) == 0
     
+    @pytest.mark.asyncio
+    @patch('services.polls.feedback.save_poll_batch')
+    @patch('services.polls.feedback.get_active_feedback_event_ids')
+    @patch('services.polls.feedback.get_events_by_date')
+    @patch('services.polls.feedback.create_feedback_poll')
+    async def test_feedback_dedupe_error_does_not_block_publish(
+        self, mock_create_feedback, mock_get_events, mock_existing_ids, mock_save_batch
+    ):
+        """A failed dedupe lookup, fetched alongside the events, only skips dedupe."""
+        mock_get_events.return_value = [{
+            'id': 'event1',
+            'title': 'Today Lecture',
+            'date': tz_today(),
+            'event_type': 'lecture',
+            'created_at': '2024-01-01T00:00:00+00:00',
+            'feedback_only': False
+        }]
+        mock_existing_ids.side_effect = Exception("Storage error")
+        mock_create_feedback.return_value = PollMeta(
+            id="feedback-poll", guild_id=12345, channel_id=67890,
+            message_id=11111, poll_date=tz_today(), is_feedback=True
+        )
+        
+        mock_guild = MagicMock()
+        mock_guild.id = 12345
+        polls = await publish_feedback_polls(MagicMock(), mock_guild, {"timezone": "Europe/Helsinki"})
+        
+        assert len(polls) == 1
+        mock_existing_ids.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_missing_poll_channel(self):
         """Test handling when poll channel is not configured."""
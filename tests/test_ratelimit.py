@@ -0,0 +1,35 @@
+# pylint: disable=import-error
+
+import time
+
+import pytest
+
+from utils.ratelimit import TokenBucket, backoff_delay
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(2, 0.2)
+
+    start = time.monotonic()
+    async with bucket:
+        pass
+    await bucket.acquire()
+    assert time.monotonic() - start < 0.05  # the initial burst is not delayed
+
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.09  # third call waits for a refill
+
+
+def test_token_bucket_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0, 1.0)
+
+
+def test_backoff_delay_grows_caps_and_honors_retry_after(monkeypatch):
+    monkeypatch.setattr("utils.ratelimit.random.uniform", lambda a, b: 0.0)
+
+    assert [backoff_delay(k) for k in range(4)] == [1.0, 2.0, 4.0, 8.0]
+    assert backoff_delay(10) == 30.0
+    assert backoff_delay(0, retry_after=5) == 5.0
+    assert backoff_delay(3, retry_after=5) == 8.0
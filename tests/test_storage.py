@@ -6,6 +6,8 @@ occurs. Only the in-memory logic is validated.
 
 # pylint: disable=import-error
 
+import asyncio
+import os
 from datetime import datetime, timedelta
 from typing import Dict
 from types import SimpleNamespace
@@ -97,4 +99,393 @@ async def test_get_storage_stats(monkeypatch):
     # Total size should be sum of individual sizes
     assert stats["total_size_bytes"] == 1024 + 2048 + 512
     # Derived KB value (float) should match bytes / 1024
-    assert abs(stats["total_size_kb"] - ((1024 + 2048 + 512) / 1024)) < 0.01 
\ No newline at end of file
+    assert abs(stats["total_size_kb"] - ((1024 + 2048 + 512) / 1024)) < 0.01 
+
+# ---------------------------------------------------------------------------
+# get_guild_settings cache
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_guild_settings_cached_until_saved(monkeypatch):
+    """Repeated reads hit the cache; saving settings invalidates it."""
+
+    storage.invalidate_guild_settings_cache()
+    stored = {"42": {"guild_id": 42, "timezone": "UTC"}}
+    load_calls = 0
+
+    async def fake_load(filename, default=None):
+        nonlocal load_calls
+        load_calls += 1
+        return list(stored.values())
+
+    async def fake_save(filename, data):
+        stored.clear()
+        stored.update({str(item["guild_id"]): item for item in data})
+        return True
+
+    monkeypatch.setattr(storage, "load", fake_load)
+    monkeypatch.setattr(storage, "save", fake_save)
+
+    first = await storage.get_guild_settings(42)
+    first["timezone"] = "mutated by caller"
+    second = await storage.get_guild_settings(42)
+    assert second["timezone"] == "UTC"
+    assert load_calls == 1
+
+    await storage.save_guild_setting({"guild_id": 42, "timezone": "Europe/Helsinki"})
+    third = await storage.get_guild_settings(42)
+    assert third["timezone"] == "Europe/Helsinki"
+    storage.invalidate_guild_settings_cache()
+
+
+# ---------------------------------------------------------------------------
+# Poll indexes
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_poll_lookup_by_message_id(monkeypatch):
+    """Message-id and active-by-guild lookups are served from the index."""
+
+    polls_list = [
+        {"id": "p1", "guild_id": 1, "message_id": 111, "closed_at": None},
+        {"id": "p2", "guild_id": 1, "message_id": 222, "closed_at": "2024-12-25T09:00:00"},
+        {"id": "p3", "guild_id": 2, "message_id": 333, "closed_at": None},
+    ]
+
+    async def fake_load(filename, default=None):
+        return polls_list
+
+    monkeypatch.setattr(storage, "load", fake_load)
+    storage.invalidate_polls_cache()
+    await storage.load_polls()
+
+    assert (await storage.get_poll_by_message_id(1, "111"))["id"] == "p1"
+    assert (await storage.get_poll_by_message_id(1, "222"))["id"] == "p2"
+    assert await storage.get_poll_by_message_id(1, "222", active_only=True) is None
+    # Polls from another guild are never matched
+    assert await storage.get_poll_by_message_id(1, "333") is None
+
+    active = await storage.get_active_polls_by_guild(1)
+    assert [poll["id"] for poll in active] == ["p1"]
+
+
+@pytest.mark.asyncio
+async def test_load_polls_reuses_parse_until_file_changes(monkeypatch, tmp_path):
+    """polls.json is only re-parsed when its mtime changes."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    real_load = storage.load
+    load_calls = 0
+
+    async def counting_load(filename, default=None):
+        nonlocal load_calls
+        load_calls += 1
+        return await real_load(filename, default)
+
+    monkeypatch.setattr(storage, "load", counting_load)
+
+    await storage.save_polls({"p1": {"id": "p1", "guild_id": 1, "message_id": 1, "closed_at": None}})
+    first = await storage.load_polls()
+    first.pop("p1")  # mutating the returned dict must not affect the cache
+    second = await storage.load_polls()
+    assert "p1" in second
+    assert load_calls == 0
+
+    # An external edit (new mtime) forces a re-parse
+    (tmp_path / "polls.json").write_text('[{"id": "p2", "guild_id": 1, "message_id": 2, "closed_at": null}]')
+    os.utime(tmp_path / "polls.json", ns=(0, 0))
+    third = await storage.load_polls()
+    assert list(third) == ["p2"]
+    assert load_calls == 1
+    storage.invalidate_polls_cache()
+
+
+# ---------------------------------------------------------------------------
+# load/save JSON round trip
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_save_load_round_trip_and_corrupt_backup(monkeypatch, tmp_path):
+    """Data survives a save/load round trip; corrupt files are backed up."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+
+    data = [{"id": "e1", "title": "Лекция 🎓", "guild_id": 1}]
+    assert await storage.save("events", data) is True
+    assert await storage.load("events", []) == data
+
+    (tmp_path / "events.json").write_bytes(b"[{not json")
+    assert await storage.load("events", []) == []
+    assert (tmp_path / "events.json.bak").read_bytes() == b"[{not json"
+
+
+@pytest.mark.asyncio
+async def test_save_poll_updates_active_index(monkeypatch, tmp_path):
+    """Publishing and closing a poll via save_poll keeps the index in step."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    poll = {"id": "p1", "guild_id": 7, "message_id": 70, "closed_at": None}
+    await storage.save_poll(poll)
+    assert [p["id"] for p in await storage.get_active_polls_by_guild(7)] == ["p1"]
+
+    await storage.save_poll({**poll, "closed_at": "2024-12-25T09:00:00+00:00"})
+    assert await storage.get_active_polls_by_guild(7) == []
+    assert (await storage.get_poll_by_message_id(7, 70))["closed_at"] is not None
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_add_events_saves_once(monkeypatch):
+    """add_events appends every event with a single save."""
+
+    saved = []
+
+    async def fake_load(filename, default=None):
+        return [{"id": "existing"}]
+
+    async def fake_save(filename, data):
+        saved.append((filename, list(data)))
+        return True
+
+    monkeypatch.setattr(storage, "load", fake_load)
+    monkeypatch.setattr(storage, "save", fake_save)
+    storage.invalidate_events_cache()
+
+    assert await storage.add_events([{"id": "a"}, {"id": "b"}]) is True
+    assert saved == [("events", [{"id": "existing"}, {"id": "a"}, {"id": "b"}])]
+    storage.invalidate_events_cache()
+
+
+@pytest.mark.asyncio
+async def test_events_by_date_index_tracks_writes(monkeypatch, tmp_path):
+    """get_events_by_date serves from the index and sees added/saved events."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_events_cache()
+
+    await storage.save_events([{"id": "e1", "date": "2024-12-25", "guild_id": 1}])
+    await storage.add_events([
+        {"id": "e2", "date": "2024-12-25", "guild_id": 2},
+        {"id": "e3", "date": "2024-12-26", "guild_id": 1},
+    ])
+
+    assert [e["id"] for e in await storage.get_events_by_date("2024-12-25")] == ["e1", "e2"]
+    assert [e["id"] for e in await storage.get_events_by_date("2024-12-25", guild_id=2)] == ["e2"]
+
+    await storage.delete_event("e1")
+    assert [e["id"] for e in await storage.get_events_by_date("2024-12-25")] == ["e2"]
+
+    # An external edit to the file is picked up via its mtime
+    (tmp_path / "events.json").write_text('[{"id": "e4", "date": "2024-12-26", "guild_id": 1}]')
+    os.utime(tmp_path / "events.json", ns=(0, 0))
+    assert [e["id"] for e in await storage.get_events_by_date("2024-12-26")] == ["e4"]
+    storage.invalidate_events_cache()
+
+
+@pytest.mark.asyncio
+async def test_save_poll_batch_writes_once(monkeypatch, tmp_path):
+    """save_poll_batch persists several polls with a single save call."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    real_save = storage.save
+    calls = []
+
+    async def counting_save(filename, data):
+        calls.append(filename)
+        return await real_save(filename, data)
+
+    monkeypatch.setattr(storage, "save", counting_save)
+
+    polls = [{"id": f"p{i}", "guild_id": 7, "message_id": i, "closed_at": None} for i in range(3)]
+    assert await storage.save_poll_batch(polls) is True
+    assert calls == ["polls"]
+    assert sorted(p["id"] for p in await storage.get_active_polls_by_guild(7)) == ["p0", "p1", "p2"]
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_save_poll_keeps_every_update(monkeypatch, tmp_path):
+    """Interleaved save_poll calls must not overwrite each other's polls."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    polls = [{"id": f"p{i}", "guild_id": 7, "message_id": i, "closed_at": None} for i in range(5)]
+    results = await asyncio.gather(*(storage.save_poll(poll) for poll in polls))
+
+    assert all(results)
+    storage.invalidate_polls_cache()
+    assert sorted(await storage.load_polls()) == ["p0", "p1", "p2", "p3", "p4"]
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_active_poll_metas_are_reused_until_saved(monkeypatch, tmp_path):
+    """PollMeta objects are rebuilt only when the stored poll changes."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    poll = {
+        "id": "p1", "guild_id": 7, "channel_id": 1, "message_id": 2, "poll_date": "2024-12-25",
+        "options": [], "published_at": "2024-12-24T12:00:00+00:00", "closed_at": None,
+    }
+    assert await storage.save_poll(poll) is True
+
+    [first] = await storage.get_active_poll_metas(7)
+    [again] = await storage.get_active_poll_metas(7)
+    assert again is first
+
+    first.reminded_users.add(5)
+    assert await storage.save_poll(first.to_dict()) is True
+    [fresh] = await storage.get_active_poll_metas(7)
+    assert fresh is not first
+    assert fresh.reminded_users == {5}
+
+    # An abandoned change is dropped instead of being handed out again
+    fresh.reminded_users.add(6)
+    storage.discard_poll_meta("p1")
+    [rebuilt] = await storage.get_active_poll_metas(7)
+    assert rebuilt.reminded_users == {5}
+
+    # Replacing the whole polls file drops every cached object too
+    assert await storage.save_polls({"p1": {**poll, "reminded_users": [9]}}) is True
+    [replaced] = await storage.get_active_poll_metas(7)
+    assert replaced is not rebuilt
+    assert replaced.reminded_users == {9}
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_queued_reminded_users_coalesce_into_one_write(monkeypatch, tmp_path):
+    """Reminded users queued for a poll are merged in with a single write."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+    assert await storage.save_poll({"id": "p1", "guild_id": 7, "message_id": 2, "closed_at": None,
+                                    "reminded_users": [9]}) is True
+
+    real_save = storage.save
+    calls = []
+
+    async def counting_save(filename, data):
+        calls.append(filename)
+        return await real_save(filename, data)
+
+    monkeypatch.setattr(storage, "save", counting_save)
+
+    for user_id in (1, 2, 3):
+        storage.queue_reminded_user("p1", user_id)
+
+    assert await storage.flush_poll_writes() is True
+    assert calls == ["polls"]
+    assert sorted((await storage.get_poll("p1"))["reminded_users"]) == [1, 2, 3, 9]
+    assert await storage.flush_poll_writes() is True
+    assert calls == ["polls"]
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_votes_saved_after_queueing(monkeypatch, tmp_path):
+    """A vote stored mid reminder run survives the reminded-users flush."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    poll = {"id": "p1", "guild_id": 7, "message_id": 2, "closed_at": None, "reminded_users": [],
+            "options": [{"event_id": "e1", "title": "A", "event_type": "lecture", "votes": []}]}
+    assert await storage.save_poll(poll) is True
+
+    storage.queue_reminded_user("p1", 5)
+    # The vote handler saves the poll through the dict path before the flush runs
+    voted = {**poll, "options": [{**poll["options"][0], "votes": [5]}]}
+    assert await storage.save_poll(voted) is True
+
+    assert await storage.flush_poll_writes() is True
+    storage.invalidate_polls_cache()
+    stored = await storage.get_poll("p1")
+    assert stored["options"][0]["votes"] == [5]
+    assert stored["reminded_users"] == [5]
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_active_attendance_poll_lookup_by_date(monkeypatch, tmp_path):
+    """The (guild, date) index only reports open attendance polls."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    attendance = {"id": "a", "guild_id": 7, "message_id": 1, "poll_date": "2024-12-25", "closed_at": None}
+    feedback = {"id": "f", "guild_id": 7, "message_id": 2, "poll_date": "2024-12-26",
+                "closed_at": None, "is_feedback": True}
+    assert await storage.save_poll_batch([attendance, feedback]) is True
+
+    assert await storage.has_active_attendance_poll(7, "2024-12-25") is True
+    assert await storage.has_active_attendance_poll(7, "2024-12-26") is False
+    assert await storage.has_active_attendance_poll(8, "2024-12-25") is False
+
+    assert await storage.save_poll({**attendance, "closed_at": "2024-12-26T09:00:00+00:00"}) is True
+    assert await storage.has_active_attendance_poll(7, "2024-12-25") is False
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_active_feedback_event_ids(monkeypatch, tmp_path):
+    """Only open feedback polls for the given guild and date contribute event ids."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    storage.invalidate_polls_cache()
+
+    def poll(poll_id, **extra):
+        return {"id": poll_id, "guild_id": 7, "message_id": poll_id, "poll_date": "2024-12-25",
+                "closed_at": None, "is_feedback": True, "options": [{"event_id": f"e-{poll_id}"}], **extra}
+
+    assert await storage.save_poll_batch([
+        poll("1"), poll("2"), poll("3", is_feedback=False),
+        poll("4", closed_at="2024-12-26T00:00:00+00:00"), poll("5", poll_date="2024-12-26"),
+    ]) is True
+
+    assert await storage.get_active_feedback_event_ids(7, "2024-12-25") == {"e-1", "e-2"}
+    assert await storage.get_active_feedback_event_ids(8, "2024-12-25") == set()
+    storage.invalidate_polls_cache()
+
+
+@pytest.mark.asyncio
+async def test_flush_waits_for_a_delayed_flush_already_writing(monkeypatch, tmp_path):
+    """An explicit flush must not cancel a delayed flush that is mid-write."""
+
+    monkeypatch.setattr(storage, "get_config", lambda: DummyConfig(data_dir=str(tmp_path)))
+    monkeypatch.setattr(storage, "POLL_WRITE_DELAY", 0)
+    storage.invalidate_polls_cache()
+    assert await storage.save_poll_batch([
+        {"id": poll_id, "guild_id": 7, "message_id": poll_id, "closed_at": None, "reminded_users": []}
+        for poll_id in ("A", "B")
+    ]) is True
+
+    real_save = storage.save
+    writing = asyncio.Event()
+
+    async def slow_save(filename, data):
+        writing.set()
+        await asyncio.sleep(0.05)
+        return await real_save(filename, data)
+
+    monkeypatch.setattr(storage, "save", slow_save)
+
+    storage.queue_reminded_user("A", 1)
+    await writing.wait()
+    storage.queue_reminded_user("B", 2)
+
+    assert await storage.flush_poll_writes() is True
+    storage.invalidate_polls_cache()
+    polls = await storage.load_polls()
+    assert (polls["A"]["reminded_users"], polls["B"]["reminded_users"]) == ([1], [2])
+    assert storage._pending_reminded_users == {}
+    storage.invalidate_polls_cache()
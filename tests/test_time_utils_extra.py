@@ -11,6 +11,7 @@ from utils.time import (
     chunk_by_days,
     to_unix_timestamp,
     get_discord_timestamp,
+    get_zone,
 )
 
 # Freeze current time for deterministic tests
@@ -109,4 +110,12 @@ def test_get_discord_timestamp():
     
     # Test with invalid date/time
     timestamp_str_invalid = get_discord_timestamp("invalid", "12:00", "UTC")
-    assert timestamp_str_invalid == "invalid 12:00"
\ No newline at end of file
+    assert timestamp_str_invalid == "invalid 12:00"
+
+
+def test_get_zone_is_memoized():
+    zone = get_zone("Europe/Helsinki")
+    assert zone == ZoneInfo("Europe/Helsinki")
+    assert get_zone("Europe/Helsinki") is zone
+    with pytest.raises(Exception):
+        get_zone("Not/AZone")
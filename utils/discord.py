@@ -23,12 +23,13 @@ Common functions for creating embeds, formatting messages, and Discord-specific
 """
 
 import logging
-from typing import Optional, Dict, List, Any, Union
+from operator import attrgetter
+from typing import Optional, Dict, Iterable, List, Any, Union
 from datetime import datetime, timezone
 
 import discord
 
-from models import PollMeta, Event, EventType
+from models import PollMeta, PollOption, Event, EventType
 from utils.time import format_datetime, get_time_until
 
 logger = logging.getLogger(__name__)
@@ -97,6 +98,14 @@ def create_info_embed(title: str, description: str = None, **kwargs) -> discord.
     return EmbedBuilder(title=f"ℹ️ {title}", description=description, color=EmbedColors.INFO).build()
 
 
+def map_answer_ids(message: discord.Message, options: Iterable[PollOption]) -> None:
+    """Record each option's Discord answer_id by matching answer text to option title."""
+    answers = message.poll.answers if message.poll else ()
+    answer_ids_by_text = {a.text: str(a.id) for a in answers}
+    for option in options:
+        option.answer_id = answer_ids_by_text.get(option.title)
+
+
 def create_poll_results_embed(poll_meta: PollMeta, poll_answers: List[Any] = None) -> discord.Embed:
     """
     Create an embed for poll results.
@@ -121,14 +130,14 @@ def create_poll_results_embed(poll_meta: PollMeta, poll_answers: List[Any] = Non
     # Add results
     results_text = ""
     if poll_answers:
-        sorted_answers = sorted(poll_answers, key=lambda a: a.vote_count, reverse=True)
+        sorted_answers = sorted(poll_answers, key=attrgetter("vote_count"), reverse=True)
         for i, answer in enumerate(sorted_answers):
             percentage = (answer.vote_count / total_votes * 100) if total_votes > 0 else 0
             emoji = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else "📝"
             results_text += f"{emoji} {answer.text}: **{answer.vote_count}** votes ({percentage:.1f}%)\n"
     else:
         # Fallback to poll_meta data
-        sorted_options = sorted(poll_meta.options, key=lambda x: x.vote_count, reverse=True)
+        sorted_options = sorted(poll_meta.options, key=attrgetter("vote_count"), reverse=True)
         for i, option in enumerate(sorted_options):
             percentage = (option.vote_count / total_votes * 100) if total_votes > 0 else 0
             emoji = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else "📝"
@@ -173,22 +182,27 @@ def create_event_embed(event: Event, show_details: bool = True) -> discord.Embed
     return embed.build()
 
 
-def create_reminder_embed(poll_channel_id: int, deadline_text: str, timezone: str) -> discord.Embed:
-    """Create an embed for poll reminders."""
-    embed = EmbedBuilder(
-        title="📝 Attendance Poll Reminder",
-        description=(
-            "You still have not voted in the attendance poll for tomorrow's events. "
-            f"Please cast your vote before the deadline!"
-        ),
-        color=EmbedColors.WARNING
-    )
-    
-    embed.add_field("🗳️ Poll Channel", f"<#{poll_channel_id}>", inline=False)
-    embed.add_field("⏰ Deadline", deadline_text, inline=False)
-    embed.set_footer("This is an automated reminder from CampPoll")
-    
-    return embed.build()
+# Static parts of the reminder embed; only the channel and deadline vary per poll
+_REMINDER_TITLE = "📝 Attendance Poll Reminder"
+_REMINDER_DESCRIPTION = (
+    "You still have not voted in the attendance poll for tomorrow's events. "
+    "Please cast your vote before the deadline!"
+)
+_REMINDER_FOOTER = {"text": "This is an automated reminder from CampPoll"}
+
+
+def create_reminder_embed(poll_channel_id: Optional[int], deadline_text: str, timezone: str) -> discord.Embed:
+    """Create an embed for poll reminders; the channel field is omitted when the channel is unknown."""
+    fields = [{"name": "⏰ Deadline", "value": deadline_text, "inline": False}]
+    if poll_channel_id is not None:
+        fields.insert(0, {"name": "🗳️ Poll Channel", "value": f"<#{poll_channel_id}>", "inline": False})
+    return discord.Embed.from_dict({
+        "title": _REMINDER_TITLE,
+        "description": _REMINDER_DESCRIPTION,
+        "color": EmbedColors.WARNING,
+        "fields": fields,
+        "footer": dict(_REMINDER_FOOTER),
+    })
 
 
 def create_guild_settings_embed(settings: Dict[str, Any]) -> discord.Embed:
@@ -302,6 +316,59 @@ def create_export_embed(poll_meta: PollMeta, export_type: str = "attendance") ->
     return embed.build()
 
 
+def _poll_stats_value(poll_meta: PollMeta) -> str:
+    return f"**{poll_meta.total_votes}** total votes\n**{len(poll_meta.options)}** options"
+
+
+def create_poll_closed_embed(poll_meta: PollMeta) -> discord.Embed:
+    """Create the confirmation embed for a manually closed poll."""
+    # Embed.from_dict builds the whole embed in one pass instead of chained add_field calls
+    return discord.Embed.from_dict({
+        "title": "✅ Poll Closed",
+        "description": f"Poll for **{poll_meta.poll_date}** has been closed manually.",
+        "color": EmbedColors.SUCCESS,
+        "fields": [
+            {"name": "📊 Final Stats", "value": _poll_stats_value(poll_meta), "inline": True},
+            {"name": "📄 Results", "value": "Results and CSV sent to organizers channel", "inline": True},
+        ],
+        "footer": {"text": f"Poll ID: {poll_meta.id}"},
+    })
+
+
+def create_attendance_export_embed(poll_meta: PollMeta) -> discord.Embed:
+    """Create the info embed sent alongside an attendance CSV export."""
+    exported = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
+    return discord.Embed.from_dict({
+        "title": "📄 Attendance Export",
+        "description": f"Detailed attendance data for poll on **{poll_meta.poll_date}**",
+        "color": EmbedColors.INFO,
+        "fields": [
+            {"name": "📊 Poll Stats", "value": _poll_stats_value(poll_meta), "inline": True},
+            {"name": "📈 Status", "value": "🔒 Closed" if poll_meta.is_closed else "🔓 Active", "inline": True},
+            {
+                "name": "📅 Export Details",
+                "value": f"Poll Date: {poll_meta.poll_date}\nExported: {exported}",
+                "inline": False,
+            },
+        ],
+        "footer": {"text": f"Poll ID: {poll_meta.id}"},
+    })
+
+
+def create_user_votes_export_embed(poll_meta: PollMeta) -> discord.Embed:
+    """Create the info embed sent alongside a user votes CSV export."""
+    return discord.Embed.from_dict({
+        "title": "👥 User Votes Export",
+        "description": f"Individual vote data for poll on **{poll_meta.poll_date}**",
+        "color": EmbedColors.POLL,
+        "fields": [
+            {"name": "📊 Voting Summary", "value": f"**{poll_meta.total_votes}** users voted", "inline": True},
+            {"name": "🔒 Privacy Notice", "value": "Contains user IDs - handle securely", "inline": True},
+        ],
+        "footer": {"text": f"Poll ID: {poll_meta.id}"},
+    })
+
+
 async def safe_send_message(
     channel: discord.abc.Messageable,
     content: str = None,
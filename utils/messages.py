@@ -7,6 +7,7 @@ import logging
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timezone
 from enum import Enum
+from operator import attrgetter
 
 from models import Event, EventType, PollMeta, GuildSettings
 from utils.time import format_datetime, get_time_until, get_discord_timestamp
@@ -213,7 +214,7 @@ def format_poll_results_text(poll_meta: PollMeta, poll_answers: List[Any] = None
     
     if poll_answers:
         # Use Discord poll data
-        sorted_answers = sorted(poll_answers, key=lambda a: a.vote_count, reverse=True)
+        sorted_answers = sorted(poll_answers, key=attrgetter("vote_count"), reverse=True)
         total_votes = sum(answer.vote_count for answer in sorted_answers)
         
         for i, answer in enumerate(sorted_answers):
@@ -222,7 +223,7 @@ def format_poll_results_text(poll_meta: PollMeta, poll_answers: List[Any] = None
             results.append(f"{emoji} {answer.text}: **{answer.vote_count}** votes ({percentage:.1f}%)")
     else:
         # Use poll metadata
-        sorted_options = sorted(poll_meta.options, key=lambda x: x.vote_count, reverse=True)
+        sorted_options = sorted(poll_meta.options, key=attrgetter("vote_count"), reverse=True)
         
         for i, option in enumerate(sorted_options):
             percentage = (option.vote_count / total_votes * 100) if total_votes > 0 else 0
@@ -0,0 +1,67 @@
+"""
+Rate limiting utilities for CampPoll bot.
+Provides a small asyncio token bucket for pacing bursts of Discord API calls
+and a jittered exponential backoff for retrying rate-limited ones.
+"""
+
+import asyncio
+import random
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Async token bucket allowing `rate` acquisitions per `per` seconds.
+
+    Use as `async with bucket:` (or `await bucket.acquire()`) before each call.
+    The bucket starts full, so short bursts go out immediately; once empty,
+    callers wait until enough time has passed for a token to refill.
+    """
+
+    def __init__(self, rate: int, per: float):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # The lock queues waiters so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self) -> "TokenBucket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+def backoff_delay(
+    attempt: int, retry_after: Optional[float] = None, base: float = 1.0, cap: float = 30.0
+) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based) of a rate-limited call.
+
+    Grows as base * 2**attempt up to `cap`, never shorter than the server's
+    Retry-After, plus up to `base` of random jitter so concurrent senders
+    don't all retry at the same instant.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    if retry_after:
+        delay = max(delay, float(retry_after))
+    return delay + random.uniform(0, base)
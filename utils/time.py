@@ -4,25 +4,30 @@ Provides timezone-aware date/time operations.
 """
 
 import logging
+from functools import lru_cache
 from datetime import datetime, timedelta, time, timezone
 from zoneinfo import ZoneInfo
 from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=16)
+def get_zone(timezone: str) -> ZoneInfo:
+    """Get a ZoneInfo for a timezone name, memoized per name."""
+    return ZoneInfo(timezone)
+
 def tz_now(timezone: str = "Europe/Helsinki") -> datetime:
     """Get current time in specified timezone."""
-    tz = ZoneInfo(timezone)
-    return datetime.now(tz)
+    return datetime.now(get_zone(timezone))
 
 def tz_today(timezone: str = "Europe/Helsinki") -> str:
     """Get today's date in YYYY-MM-DD format for specified timezone."""
-    return tz_now(timezone).strftime("%Y-%m-%d")
+    return tz_now(timezone).date().isoformat()
 
 def tz_tomorrow(timezone: str = "Europe/Helsinki") -> str:
     """Get tomorrow's date in YYYY-MM-DD format for specified timezone."""
-    tomorrow = tz_now(timezone) + timedelta(days=1)
-    return tomorrow.strftime("%Y-%m-%d")
+    tomorrow = tz_now(timezone).date() + timedelta(days=1)
+    return tomorrow.isoformat()
 
 def parse_time(time_str: str) -> Optional[Tuple[int, int]]:
     """
@@ -74,7 +79,7 @@ def create_scheduled_time(date_str: str, time_str: str, timezone: str) -> Option
         time_obj = time(hour, minute)
         
         # Combine and localize
-        tz = ZoneInfo(timezone)
+        tz = get_zone(timezone)
         # Python 3.11+ supports tzinfo param for combine; fallback otherwise
         try:
             dt = datetime.combine(date_obj, time_obj, tzinfo=tz)  # type: ignore[arg-type]
@@ -117,7 +122,7 @@ def next_occurrence(time_str: str, timezone: str = "Europe/Helsinki") -> Optiona
 def is_valid_timezone(tz_name: str) -> bool:
     """Check if a timezone name is valid."""
     try:
-        ZoneInfo(tz_name)
+        get_zone(tz_name)
         return True
     except Exception as e:
         logger.warning(f"Invalid timezone '{tz_name}': {e}")
@@ -231,6 +236,7 @@ def get_discord_timestamp(date_str: str, time_str: str, timezone: str, style: st
     return f"<t:{timestamp}:{style}>"
 
 
+@lru_cache(maxsize=1024)
 def get_poll_closing_date(
     poll_date: str, publish_time: str, close_time: str, timezone: str = "Europe/Helsinki"
 ) -> str:
@@ -245,6 +251,9 @@ def get_poll_closing_date(
     
     Returns:
         Date when poll should close (YYYY-MM-DD)
+    
+    The result depends only on the arguments, so it is memoized; close and
+    reminder passes ask for the same few dates over and over.
     """
     try:
         publish_parts = parse_time(publish_time)